@@ -578,8 +578,32 @@ const methods = {
     },
 
     shuffleTrack: function (player, data) {
-        const tracks = data?.tracks;
         const queueType = data?.queueType;
+        let tracks = data?.tracks;
+
+        // The relay may send the new order as indexes into the current section
+        if (data?.order) {
+            const section =
+                queueType === "queue"
+                    ? player.queue.slice(player.currentQueuePosition + 1)
+                    : player.queue.slice(0, player.currentQueuePosition);
+
+            if (section.length !== data.order.length) {
+                return player.send({ op: "initPlayer" });
+            }
+            const shuffled = data.order.map((index) => section[index]);
+            if (queueType === "queue") {
+                player.queue.splice(player.currentQueuePosition + 1);
+                player.queue.push(...shuffled);
+            } else {
+                player.queue.splice(0, player.currentQueuePosition, ...shuffled);
+            }
+            player.tm.showToast(
+                data.requesterId,
+                formatString(localeTexts.shuffleTracks, capitalize(queueType))
+            );
+            return player.updateCurrentQueuePos();
+        }
 
         if (!tracks) return;
 
@@ -1005,7 +1029,7 @@ class Player {
         this.socket = new Socket(
             this,
             `${window.location.protocol === "https:" ? "wss" : "ws"}://${window.location.hostname
-            }:${window.location.port}/ws_user`
+            }:${window.location.port}/ws_user?encoding=${WS_ENCODING}${WS_DECODED_TRACKS && preferDecodedTracks() ? "&tracks=decoded" : ""}`
         );
         this.socket.connect(this);
         this.socket.addMessageListener((msg) => this.handleMessage(msg));
@@ -1028,6 +1052,7 @@ class Player {
         this.lastUpdate = 0;
         this.isConnected = true;
         this.autoplay = false;
+        this.seq = 0;
 
         this.bots = new Map();
         this.selectedBot = null;
@@ -1051,16 +1076,37 @@ class Player {
     }
 
     handleMessage(msg) {
-        const data = JSON.parse(msg);
+        const data = msg instanceof ArrayBuffer ? decodeMsgPack(msg) : JSON.parse(msg);
         const op = data.op;
         const validMethods = Object.keys(methods);
 
+        if (data.seq !== undefined && data.guildId === this.guildId && this.guildId) {
+            // Ignore a cached player snapshot older than what we already have
+            if (data.snapshot && data.seq < this.seq) {
+                return;
+            }
+            // A queue edit was missed, ask for the full player state again
+            if (data.op !== "initPlayer" && data.seq > this.seq + 1) {
+                this.seq = data.seq;
+                return this.send({ op: "initPlayer" });
+            }
+        }
+
+        if (data.trackInfo) {
+            cacheTrackInfo(data);
+        }
+
         if (validMethods.includes(op)) {
             methods[op](this, data);
         } else {
             console.log(`Invalid action: ${op}`);
         }
 
+        // Sequence numbers are per guild, another guild's must not move ours
+        if (data.seq !== undefined && data.guildId === this.guildId) {
+            this.seq = data.seq;
+        }
+
         return this.updateInfo();
     }
 
@@ -1082,6 +1128,7 @@ class Player {
         this.autoplay = false;
         this.channelName = "";
         this.filters = [];
+        this.seq = 0;
 
         this.updateCurrentQueuePos();
         this.updateSelectedBotView();
@@ -1,3 +1,46 @@
+const TRACK_INFO_CACHE_SIZE = 20000;
+const TRACK_INFO_CACHE = new Map();
+// Order of the values in each trackInfo entry, see TRACK_INFO_FIELDS in transformer.py
+const TRACK_INFO_FIELDS = ["title", "author", "length", "identifier", "isStream", "uri", "artworkUrl", "isrc", "sourceName", "position"];
+
+// Distinct encoded tracks of a payload in order, mirrors track_ids() in transformer.py
+function trackIds(data) {
+    let tracks = data.tracks;
+    if (!Array.isArray(tracks)) {
+        tracks = data.op === "initUser" ? data.data?.history ?? [] : [];
+    }
+    const ids = new Set(tracks.map((track) => (track !== null && typeof track === "object" ? track.trackId : track)));
+    ids.add(data.firstTrackId);
+    return [...ids].filter((trackId) => typeof trackId === "string");
+}
+
+// Only ask the server to decode tracks where decoding them here is expensive
+// and the extra bytes on the wire are not a concern
+function preferDecodedTracks() {
+    if (navigator.connection?.saveData) {
+        return false;
+    }
+    return (navigator.deviceMemory ?? 8) <= 4 || (navigator.hardwareConcurrency ?? 8) <= 4;
+}
+
+// Store tracks the server has already decoded, keyed by their encoded string
+function cacheTrackInfo(data) {
+    const ids = trackIds(data);
+    data.trackInfo.forEach((values, index) => {
+        if (!values || index >= ids.length) return;
+
+        const info = { isSeekable: !values[4] };
+        TRACK_INFO_FIELDS.forEach((field, i) => {
+            if (values[i] !== null && values[i] !== undefined) info[field] = values[i];
+        });
+        TRACK_INFO_CACHE.delete(ids[index]);
+        TRACK_INFO_CACHE.set(ids[index], info);
+    });
+    while (TRACK_INFO_CACHE.size > TRACK_INFO_CACHE_SIZE) {
+        TRACK_INFO_CACHE.delete(TRACK_INFO_CACHE.keys().next().value);
+    }
+}
+
 class DataReader {
     constructor(base64Str) {
         const binaryStr = atob(base64Str);
@@ -194,6 +237,11 @@ function readTrackCommon(reader) {
 }
 
 function decode(trackId, requester, sourceDecoders = {}) {
+    const info = TRACK_INFO_CACHE.get(trackId);
+    if (info) {
+        return new Track({ trackId, ...info }, requester);
+    }
+
     const decoders = { ...DEFAULT_DECODER_MAPPING, ...sourceDecoders };
     const reader = new DataReader(trackId);
 
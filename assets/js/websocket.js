@@ -20,6 +20,7 @@ class Socket {
     // Initialize the socket connection
     connect() {
         this.socket = new WebSocket(this.url);
+        this.socket.binaryType = "arraybuffer"; // Binary frames are MessagePack encoded
 
         this.socket.onopen = () => {
             console.log("Connected to server!");
@@ -0,0 +1,77 @@
+"""
+CPU time per broadcast at 10, 100 and 1000 listeners: fan_out encoding a
+frame once for every listener against encoding it with the stdlib json
+for each listener in turn, as Guild.broadcast did before. Includes the
+writer tasks handing the frames to the (instant) websockets.
+
+    python bench/broadcast_cpu.py --broadcasts 200
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from objects import Outbox, UserPool, fan_out
+from track_info import encode_track
+
+class NullWebsocket:
+    async def send(self, data) -> None:
+        pass
+
+    async def close(self, code: int = 1000) -> None:
+        pass
+
+async def per_listener(users, payload) -> None:
+    """The broadcast path from before fan_out."""
+    for user in users:
+        await user.send_raw(json.dumps(payload), payload.get("op"), payload.get("guildId"))
+
+async def _drained(users) -> None:
+    while any(user._outbox.depth for user in users):
+        await asyncio.sleep(0)
+    await asyncio.sleep(0)
+
+async def _cpu_per_broadcast(broadcast, users, payload, count: int) -> float:
+    start = time.process_time()
+    for _ in range(count):
+        await broadcast(users, payload)
+        await _drained(users)
+    return (time.process_time() - start) / count
+
+async def run(args) -> None:
+    UserPool._max_entries = max(args.listeners) + 1
+    payloads = {
+        "playerUpdate": {"op": "playerUpdate", "guildId": "1", "lastUpdate": 1760000000000, "isConnected": True, "lastPosition": 61234},
+        "addTrack, 50 tracks": {"op": "addTrack", "guildId": "1", "tracks": [encode_track(i) for i in range(50)], "requesterId": "2", "position": 0, "seq": 4}
+    }
+
+    print(f"{'listeners':>9}  {'frame':<20} {'per listener':>14} {'encode once':>14} {'speedup':>8}")
+    for count in args.listeners:
+        users = []
+        for index in range(count):
+            user = UserPool.add({"id": f"{count}-{index}", "global_name": f"listener{index}"})
+            user._websocket = NullWebsocket()
+            user._outbox = Outbox(user, user._websocket, max_size=args.broadcasts + 1)
+            users.append(user)
+
+        for name, payload in payloads.items():
+            broadcasts = max(1, args.broadcasts * 10 // count)
+            before = await _cpu_per_broadcast(per_listener, users, payload, broadcasts)
+            after = await _cpu_per_broadcast(fan_out, users, payload, broadcasts)
+            print(f"{count:>9}  {name:<20} {before * 1e6:11.0f} us {after * 1e6:11.0f} us {before / after:7.1f}x")
+
+        for user in users:
+            user._outbox.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--listeners", type=int, nargs="+", default=[10, 100, 1000])
+    parser.add_argument("--broadcasts", type=int, default=200, help="broadcasts at 10 listeners, fewer for larger guilds")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Concurrent dashboard logins against a local fake Discord API: the shared,
+pooled session requests_api uses now against a new ClientSession per call,
+as before. Each login is the /oauth2/token, /users/@me and /users/@me/guilds
+calls the callback and first page load make for a new user.
+
+    python bench/discord_sessions.py --logins 500 --concurrency 50 --handshake 0.03
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+
+import objects  # noqa: F401, utils can only be imported after objects
+
+from fake_discord import FakeDiscord
+from utils import close_http_session, requests_api
+
+async def session_per_call(url: str, method: str = "GET", data: dict = None, headers: dict = None):
+    """The requests_api body from before the shared session."""
+    async with aiohttp.ClientSession() as session:
+        if method == "GET":
+            resp = await session.get(url, headers=headers)
+        else:
+            resp = await session.post(url, data=data, headers=headers)
+
+        if resp.status != 200:
+            return None
+        return await resp.json(encoding="utf-8")
+
+async def login(request, base_url: str, index: int) -> float:
+    start = time.perf_counter()
+    token = (await request(f"{base_url}/oauth2/token", "POST", data={"code": str(index)}))["id"] + str(index)
+    headers = {"Authorization": f"Bearer {token}"}
+    assert await request(f"{base_url}/users/@me", headers=headers)
+    assert await request(f"{base_url}/users/@me/guilds", headers=headers)
+    return time.perf_counter() - start
+
+def _percentile(values, percent: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * percent / 100))]
+
+async def run(name: str, request, args) -> None:
+    discord = FakeDiscord(handshake=args.handshake)
+    discord.delay = args.delay
+    await discord.start()
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+    async def limited(index: int) -> float:
+        async with semaphore:
+            return await login(request, discord.base_url, index)
+
+    try:
+        start = time.perf_counter()
+        latencies = await asyncio.gather(*[limited(index) for index in range(args.logins)])
+        elapsed = time.perf_counter() - start
+    finally:
+        await close_http_session()
+        await discord.stop()
+
+    print(
+        f"{name:<18} {args.logins / elapsed:8.1f} logins/s  p50 {_percentile(latencies, 50) * 1000:7.1f} ms  "
+        f"p99 {_percentile(latencies, 99) * 1000:7.1f} ms  {discord.connections:5d} connections"
+    )
+
+async def compare(args) -> None:
+    print(
+        f"{args.logins} logins, {args.concurrency} at a time, {args.delay * 1000:.0f} ms per request, "
+        f"{args.handshake * 1000:.0f} ms per new connection"
+    )
+    await run("session per call", session_per_call, args)
+    await run("shared session", requests_api, args)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--delay", type=float, default=0.005, help="seconds the fake API takes per request")
+    parser.add_argument("--handshake", type=float, default=0.03, help="extra seconds for the first request on a new connection")
+    asyncio.run(compare(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Bytes on the wire and relay CPU per frame for each websocket encoding, with
+and without permessage-deflate, on the frames a client typically receives.
+
+    python bench/encodings.py --tracks 5000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from track_info import encode_track
+from utils import encode_payload, msgpack
+from wire import DeflateStream, size
+
+def payloads(track_count: int):
+    """(name, payload) for a representative frame of each kind."""
+    tracks = [{"trackId": encode_track(i), "requesterId": str(i % 5)} for i in range(track_count)]
+    return [
+        (f"initPlayer, {track_count} tracks", {
+            "op": "initPlayer", "guildId": "1", "tracks": tracks, "currentQueuePosition": 1, "isPaused": False,
+            "currentPosition": 61234, "volume": 100, "repeatMode": "off", "channelName": "Music",
+            "users": [{"userId": str(i), "avatarUrl": f"https://cdn.discordapp.com/avatars/{i}/a.png"} for i in range(5)]
+        }),
+        ("addTrack, 1 track", {"op": "addTrack", "guildId": "1", "tracks": [encode_track(10**6)], "requesterId": "2", "position": 0}),
+        ("playerUpdate", {"op": "playerUpdate", "guildId": "1", "lastUpdate": 1760000000000, "isConnected": True, "lastPosition": 61234}),
+        ("search results, 50 tracks", {"op": "getTracks", "callback": "search-result-tracks", "tracks": [encode_track(i) for i in range(50)]}),
+        ("updateGuild", {
+            "op": "updateGuild", "guildId": "1", "channelName": "Music", "isJoined": True,
+            "user": {"userId": "2", "avatarUrl": "https://cdn.discordapp.com/avatars/2/a.png"}
+        })
+    ]
+
+def _per_call(func, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    return (time.perf_counter() - start) / repeat
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=200, help="encodes per small frame, the initPlayer uses a tenth")
+    args = parser.parse_args()
+
+    encodings = ["json"] + (["msgpack"] if msgpack else [])
+    print(f"{'frame':<28} {'encoding':<16} {'bytes':>13} {'encode':>11} {'deflate':>11}")
+    for name, payload in payloads(args.tracks):
+        repeat = max(1, args.repeat // 10) if name.startswith("initPlayer") else args.repeat
+        for encoding in encodings:
+            data = encode_payload(payload, encoding)
+            encode_time = _per_call(lambda: encode_payload(payload, encoding), repeat)
+            print(f"{name:<28} {encoding:<16} {size(data):13d} {encode_time * 1e6:8.1f} µs {'':>11}")
+
+            # A fresh stream per frame so context takeover doesn't reward repeating the same frame
+            deflated = DeflateStream().frame_size(data)
+            deflate_time = _per_call(lambda: DeflateStream().frame_size(data), repeat)
+            print(f"{'':<28} {encoding + '+deflate':<16} {deflated:13d} {encode_time * 1e6:8.1f} µs {deflate_time * 1e6:8.1f} µs")
+
+    if not msgpack:
+        print("msgpack is not installed, only json was measured")
+
+if __name__ == "__main__":
+    main()
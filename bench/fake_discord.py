@@ -0,0 +1,50 @@
+"""A local stand-in for the Discord API for the benchmarks and tests."""
+import asyncio
+import time
+
+from aiohttp import web
+
+class FakeDiscord:
+    """
+    Serves each route's scripted responses in order, then 200s. The first
+    request on every new connection waits `handshake` seconds on top of
+    `delay`, standing in for the TCP and TLS handshakes to discord.com.
+    """
+    def __init__(self, handshake: float = 0):
+        self.scripts = {}
+        self.calls = {}
+        self.delay: float = 0
+        self.handshake: float = handshake
+        self.connections: int = 0
+        self.runner = None
+        self.base_url = ""
+        self._transports = set()
+
+    def script(self, path: str, *responses) -> None:
+        self.scripts[path] = list(responses)
+        self.calls[path] = []
+
+    async def handle(self, request: web.Request) -> web.Response:
+        path = request.path
+        self.calls.setdefault(path, []).append(time.monotonic())
+        if request.transport not in self._transports:
+            self._transports.add(request.transport)
+            self.connections += 1
+            await asyncio.sleep(self.handshake)
+        await asyncio.sleep(self.delay)
+
+        script = self.scripts.get(path) or []
+        status, headers, body = script.pop(0) if script else (200, {}, {"id": "1", "path": path})
+        return web.json_response(body, status=status, headers=headers)
+
+    async def start(self) -> None:
+        app = web.Application()
+        app.router.add_route("*", "/{tail:.*}", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        self.base_url = f"http://127.0.0.1:{site._server.sockets[0].getsockname()[1]}/api"
+
+    async def stop(self) -> None:
+        await self.runner.cleanup()
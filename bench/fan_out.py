@@ -0,0 +1,132 @@
+"""
+Load test for guild fan-out: hundreds of simulated listeners per guild, one
+of them on a stalled link, receiving a stream of player updates and queue
+edits through Guild.relay like the frames a bot sends.
+
+    python bench/fan_out.py --guilds 2 --listeners 250 --seconds 15
+    python bench/fan_out.py --seconds 1 --sequential   # one send after another, as before
+    python bench/fan_out.py --rate 100 --coalesce 0.1  # player state coalesced per tick
+
+Reports the delivery delay to the healthy listeners, how many frames they
+received against what the bot sent, what happened to the slow one and how
+late the event loop ran.
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from objects import Guild, Outbox, UserPool
+from utils import encode_payload, json_loads
+
+class FakeWebsocket:
+    """Records when each frame finished sending, after `delay` seconds on the wire."""
+    def __init__(self, delay: float = 0):
+        self.delay: float = delay
+        self.frames = []
+        self.closed: bool = False
+
+    async def send(self, data) -> None:
+        await asyncio.sleep(self.delay)
+        self.frames.append((time.perf_counter(), data))
+
+    async def close(self, code: int = 1000) -> None:
+        self.closed = True
+
+def _percentile(values, percent: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * percent / 100))] if values else 0
+
+async def run(args) -> None:
+    Guild.configure({"coalesce_interval": args.coalesce})
+    UserPool._max_entries = args.guilds * args.listeners + 1
+
+    guilds, sockets, slow_sockets = [], [], []
+    for guild_index in range(args.guilds):
+        guild = Guild(None, str(guild_index))
+        for index in range(args.listeners):
+            slow = index == 0
+            user = UserPool.add({"id": f"{guild_index}-{index}", "global_name": f"listener{index}"})
+            websocket = FakeWebsocket(args.slow_delay if slow else args.delay)
+            user._websocket, user._outbox = websocket, Outbox(user, websocket)
+            user.guild, guild._users[user.id] = guild, user
+            (slow_sockets if slow else sockets).append(websocket)
+        guilds.append(guild)
+
+    lag, stop = [], asyncio.Event()
+    async def monitor():
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            lag.append(time.perf_counter() - start - 0.01)
+    monitor_task = asyncio.create_task(monitor())
+
+    sent_at, frames = {}, int(args.seconds * args.rate)
+    start = time.perf_counter()
+    for number in range(frames):
+        # Mostly position updates with a queue edit every tenth frame
+        op = "addTrack" if number % 10 == 0 else "playerUpdate"
+        for guild in guilds:
+            payload = {"op": op, "guildId": guild.id, "frame": number}
+            if op == "addTrack":
+                payload["tracks"] = []
+            else:
+                payload["lastPosition"] = number * 100
+            guild.update_snapshot(payload)
+
+            sent_at[(guild.id, number)] = time.perf_counter()
+            if args.sequential:
+                data = encode_payload(payload)
+                for user in list(guild._users.values()):
+                    await user._websocket.send(data)
+            else:
+                await guild.relay(payload)
+
+        await asyncio.sleep(max(0, start + (number + 1) / args.rate - time.perf_counter()))
+
+    for guild in guilds:
+        await guild.flush()
+    await asyncio.sleep(max(args.delay * 10, 0.5))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor_task
+
+    delays, delivered, edits_received = [], 0, []
+    for websocket in sockets:
+        edits = 0
+        for received_at, data in websocket.frames:
+            frame = json_loads(data)
+            delays.append(received_at - sent_at[(frame["guildId"], frame["frame"])])
+            delivered += 1
+            edits += frame["op"] == "addTrack"
+        edits_received.append(edits)
+    edits_sent = len(range(0, frames, 10))
+
+    mode = "sequential sends" if args.sequential else f"concurrent fan-out, coalesce {args.coalesce}s"
+    print(f"{args.guilds} guilds x {args.listeners} listeners, {frames} frames per guild at {args.rate}/s, {mode}")
+    print(f"  run took {elapsed:.2f}s for {args.seconds}s of frames")
+    print(f"  frames per listener: {frames} sent by the bot, {delivered / max(1, len(sockets)):.1f} received on average, "
+          f"queue edits {min(edits_received, default=0)}/{edits_sent} received by every listener")
+    print(f"  healthy listeners: {delivered} frames delivered, delay p50 {_percentile(delays, 50) * 1000:.1f} ms, "
+          f"p99 {_percentile(delays, 99) * 1000:.1f} ms, max {max(delays, default=0) * 1000:.1f} ms")
+    print(f"  slow listeners ({args.slow_delay}s per send): {sum(len(websocket.frames) for websocket in slow_sockets)} frames delivered, "
+          f"{sum(websocket.closed for websocket in slow_sockets)}/{len(slow_sockets)} disconnected")
+    print(f"  event loop lag p99 {_percentile(lag, 99) * 1000:.1f} ms, max {max(lag, default=0) * 1000:.1f} ms")
+    print(f"  outbox stats: {Outbox.stats()}")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--guilds", type=int, default=2)
+    parser.add_argument("--listeners", type=int, default=250, help="listeners per guild, the first one is slow")
+    parser.add_argument("--seconds", type=float, default=15)
+    parser.add_argument("--rate", type=float, default=20, help="frames per second per guild")
+    parser.add_argument("--delay", type=float, default=0.001, help="seconds a healthy listener takes per send")
+    parser.add_argument("--slow-delay", type=float, default=2, help="seconds the slow listener takes per send")
+    parser.add_argument("--coalesce", type=float, default=0, help="Guild coalesce_interval")
+    parser.add_argument("--sequential", action="store_true", help="await each send in turn, as before concurrent fan-out")
+    asyncio.run(run(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,164 @@
+"""
+GeoIP lookups per second through check_country_with_ip: the long-lived
+memory-mapped reader with its address cache against opening the database
+in a worker thread for every lookup, as before. Uses a generated
+country database unless --db points at a real GeoLite2 one.
+
+    python bench/geoip.py --lookups 20000
+    python bench/geoip.py --db geolite_db/GeoLite2-City.mmdb
+"""
+import argparse
+import asyncio
+import ipaddress
+import os
+import random
+import struct
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from geoip2 import database, errors
+
+import objects  # noqa: F401, utils can only be imported after objects
+import utils
+
+COUNTRIES = [("DE", "Germany"), ("US", "United States"), ("JP", "Japan"), ("BR", "Brazil"), ("FR", "France"), ("TW", "Taiwan")]
+
+def _control(type_id: int, size: int) -> bytes:
+    extended = b""
+    if size >= 65821:
+        size_bits, extra = 31, (size - 65821).to_bytes(3, "big")
+    elif size >= 285:
+        size_bits, extra = 30, (size - 285).to_bytes(2, "big")
+    elif size >= 29:
+        size_bits, extra = 29, (size - 29).to_bytes(1, "big")
+    else:
+        size_bits, extra = size, b""
+
+    if type_id > 7:
+        type_id, extended = 0, bytes([type_id - 7])
+    return bytes([type_id << 5 | size_bits]) + extended + extra
+
+def _uint(value: int, type_id: int = 6) -> bytes:
+    """Encode an unsigned integer, uint16 (5), uint32 (6) or uint64 (9)."""
+    data = value.to_bytes((value.bit_length() + 7) // 8, "big")
+    return _control(type_id, len(data)) + data
+
+def _encode(value) -> bytes:
+    """Encode a value in the MaxMind DB data section format, bytes are taken as already encoded."""
+    if isinstance(value, bytes):
+        return value
+    if isinstance(value, str):
+        data = value.encode("utf-8")
+        return _control(2, len(data)) + data
+    if isinstance(value, dict):
+        return _control(7, len(value)) + b"".join(_encode(key) + _encode(item) for key, item in value.items())
+    if isinstance(value, list):
+        return _control(11, len(value)) + b"".join(_encode(item) for item in value)
+    return _uint(value)
+
+def write_database(path: str, networks) -> None:
+    """Write an IPv4 country database holding `networks`, a list of (IPv4Network, iso code, name)."""
+    nodes, data, offsets = [[None, None]], b"", {}
+    for network, iso_code, name in networks:
+        if iso_code not in offsets:
+            offsets[iso_code] = len(data)
+            data += _encode({"country": {"iso_code": iso_code, "names": {"en": name}}})
+
+        bits, node = int(network.network_address), 0
+        for depth in range(network.prefixlen):
+            bit = bits >> (31 - depth) & 1
+            if depth == network.prefixlen - 1:
+                nodes[node][bit] = ("data", offsets[iso_code])
+            else:
+                if nodes[node][bit] is None:
+                    nodes.append([None, None])
+                    nodes[node][bit] = len(nodes) - 1
+                node = nodes[node][bit]
+
+    def record(value) -> int:
+        if value is None:
+            return len(nodes)
+        if isinstance(value, tuple):
+            return len(nodes) + 16 + value[1]
+        return value
+
+    tree = b"".join(struct.pack(">I", record(left))[1:] + struct.pack(">I", record(right))[1:] for left, right in nodes)
+    metadata = {
+        "node_count": _uint(len(nodes)),
+        "record_size": _uint(24, 5),
+        "ip_version": _uint(4, 5),
+        "database_type": "GeoLite2-Country",
+        "languages": ["en"],
+        "binary_format_major_version": _uint(2, 5),
+        "binary_format_minor_version": _uint(0, 5),
+        "build_epoch": _uint(int(time.time()), 9),
+        "description": {"en": "Generated for bench/geoip.py"}
+    }
+    with open(path, "wb") as file:
+        file.write(tree + bytes(16) + data + b"\xab\xcd\xefMaxMind.com" + _encode(metadata))
+
+def random_networks(count: int, rng: random.Random):
+    """`count` distinct /24 networks spread over the public IPv4 space."""
+    prefixes = rng.sample(range(1 << 8, 223 << 16), count)
+    return [
+        (ipaddress.IPv4Network((prefix << 8, 24)), *rng.choice(COUNTRIES))
+        for prefix in prefixes
+    ]
+
+def open_per_lookup(address: str):
+    """The lookup check_country_with_ip ran in a thread before the shared reader."""
+    with database.Reader(utils.GEODB_PATH) as reader:
+        try:
+            return reader.country(address).country
+        except errors.AddressNotFoundError:
+            return None
+
+async def _rate(lookup, addresses) -> float:
+    start = time.perf_counter()
+    for address in addresses:
+        await lookup(address)
+    return len(addresses) / (time.perf_counter() - start)
+
+async def compare(args) -> None:
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory() as directory:
+        if args.db:
+            utils.GEODB_PATH = args.db
+            networks = [(ipaddress.IPv4Network(f"{rng.randrange(1, 223)}.{rng.randrange(256)}.{rng.randrange(256)}.0/24"),)
+                        for _ in range(args.networks)]
+        else:
+            utils.GEODB_PATH = os.path.join(directory, "country.mmdb")
+            networks = random_networks(args.networks, rng)
+            write_database(utils.GEODB_PATH, networks)
+
+        def addresses(distinct: int):
+            pool = [str(rng.choice(networks)[0][rng.randrange(1, 255)]) for _ in range(distinct)]
+            return [rng.choice(pool) for _ in range(args.lookups)]
+
+        workloads = [
+            ("returning visitors, 1000 addresses", addresses(1000)),
+            ("every address new", addresses(args.lookups * 10))
+        ]
+        print(f"{args.lookups} lookups per workload, {len(networks)} networks in {utils.GEODB_PATH}")
+        print(f"{'workload':<36} {'open per lookup':>18} {'shared reader':>18}")
+        for name, workload in workloads:
+            utils.close_geoip_reader()
+            utils.open_geoip_reader()
+            before = await _rate(lambda address: asyncio.to_thread(open_per_lookup, address), workload[:args.lookups // 10])
+            after = await _rate(utils.check_country_with_ip, workload)
+            print(f"{name:<36} {before:11.0f} /s     {after:11.0f} /s")
+        utils.close_geoip_reader()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lookups", type=int, default=20000, help="lookups per workload, the old path runs a tenth of them")
+    parser.add_argument("--networks", type=int, default=50000, help="networks in the generated database")
+    parser.add_argument("--db", help="a real GeoLite2 database to use instead of a generated one")
+    parser.add_argument("--seed", type=int, default=1)
+    asyncio.run(compare(parser.parse_args()))
+
+if __name__ == "__main__":
+    main()
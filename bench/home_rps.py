@@ -0,0 +1,114 @@
+"""
+Requests per second of the dashboard page, /, for logged in users.
+
+First through Quart's test client in this process: rendering index.html
+on every request, as before, against the pre-rendered per-language shell,
+and a revalidation answered with 304. Then over HTTP against a live
+server with --concurrency clients at a time, for full pages and 304s.
+
+    python bench/home_rps.py --requests 2000 --concurrency 20
+"""
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+
+from server import DashboardServer
+
+async def _rate(get, count: int, concurrency: int) -> float:
+    async def client(index: int) -> None:
+        for number in range(index, count, concurrency):
+            await get(number)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(concurrency)))
+    return count / (time.perf_counter() - start)
+
+async def in_process(server: DashboardServer, args) -> None:
+    # main reads settings.json from the working directory when imported
+    server._write_settings()
+    os.chdir(server.directory)
+    import main
+
+    render_every_time = False
+
+    @main.app.before_request
+    async def drop_page_shells() -> None:
+        if render_every_time:
+            main.PAGE_SHELLS.clear()
+
+    cookies = [{"Cookie": f"session={server.session_cookie(index)['session']}"} for index in range(args.users)]
+    etags = []
+    async with main.app.test_app() as test_app:
+        client = test_app.test_client()
+        for headers in cookies:
+            etags.append((await client.get("/", headers=headers)).headers["ETag"])
+
+        async def fresh(number: int) -> None:
+            assert (await client.get("/", headers=cookies[number % args.users])).status_code == 200
+
+        async def revalidated(number: int) -> None:
+            headers = {**cookies[number % args.users], "If-None-Match": etags[number % args.users]}
+            assert (await client.get("/", headers=headers)).status_code == 304
+
+        count = args.requests // 4
+        render_every_time = True
+        before = await _rate(fresh, count // 5, 1)
+        render_every_time = False
+        after = await _rate(fresh, count, 1)
+        not_modified = await _rate(revalidated, count, 1)
+
+    print("Quart test client, one request at a time")
+    print(f"  rendered per request  {before:8.0f} req/s")
+    print(f"  pre-rendered shell    {after:8.0f} req/s  {after / before:5.1f}x")
+    print(f"  304 revalidation      {not_modified:8.0f} req/s  {not_modified / before:5.1f}x")
+
+async def over_http(server: DashboardServer, args) -> None:
+    cookies = [f"session={server.session_cookie(index)['session']}" for index in range(args.users)]
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+        etags = []
+        for cookie in cookies:
+            async with session.get(f"{server.url}/", headers={"Cookie": cookie}, allow_redirects=False) as response:
+                etags.append(response.headers["ETag"])
+
+        async def fresh(number: int) -> None:
+            async with session.get(f"{server.url}/", headers={"Cookie": cookies[number % args.users]}, allow_redirects=False) as response:
+                await response.read()
+                assert response.status == 200
+
+        async def revalidated(number: int) -> None:
+            headers = {"Cookie": cookies[number % args.users], "If-None-Match": etags[number % args.users]}
+            async with session.get(f"{server.url}/", headers=headers, allow_redirects=False) as response:
+                assert response.status == 304
+
+        full = await _rate(fresh, args.requests, args.concurrency)
+        not_modified = await _rate(revalidated, args.requests, args.concurrency)
+
+    print(f"HTTP against a live server, {args.concurrency} clients at a time")
+    print(f"  full page             {full:8.0f} req/s")
+    print(f"  304 revalidation      {not_modified:8.0f} req/s")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=2000, help="requests over HTTP, a quarter of them in process")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--users", type=int, default=50, help="logged in users taking turns")
+    args = parser.parse_args()
+
+    cwd, server = os.getcwd(), DashboardServer(users=args.users)
+    try:
+        asyncio.run(in_process(server, args))
+    finally:
+        os.chdir(cwd)
+        server.stop()
+
+    with DashboardServer(users=args.users) as server:
+        asyncio.run(over_http(server, args))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""
+Bytes on the wire per listener for common queue edits on a large queue:
+the frame the bot sends, the edit frame the relay broadcasts (a shuffle is
+rewritten to a list of old indexes) and resending the whole queue (an
+initPlayer) after every edit.
+
+    python bench/queue_edits.py --tracks 5000
+"""
+import argparse
+import copy
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from objects import Guild
+from track_info import encode_track
+from utils import encode_payload
+from wire import DeflateStream, kib, size
+
+def edits(tracks, rng: random.Random):
+    """(name, frame the bot sends) for each edit, indexes relative to the current track."""
+    length = len(tracks) - 1
+    shuffled = tracks[1:]
+    rng.shuffle(shuffled)
+    return [
+        ("add 1 track", {"op": "addTrack", "tracks": [encode_track(10**6)], "requesterId": "2", "position": 0}),
+        ("add a 100 track playlist", {"op": "addTrack", "tracks": [encode_track(10**6 + i) for i in range(100)], "requesterId": "2", "position": 0}),
+        ("move a track", {"op": "moveTrack", "movedTrack": {"index": 10, "trackId": tracks[10]["trackId"]}, "newIndex": length - 10}),
+        ("swap two tracks", {"op": "swapTrack", "index1": {"index": 5}, "index2": {"index": length - 5}}),
+        ("remove 3 tracks", {"op": "removeTrack", "indexes": [3, 30, 300]}),
+        ("shuffle the queue", {"op": "shuffleTrack", "queueType": "queue", "tracks": shuffled}),
+        ("clear the queue", {"op": "clearQueue", "queueType": "queue"})
+    ]
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=5000)
+    parser.add_argument("--seed", type=int, default=1)
+    args = parser.parse_args()
+
+    tracks = [{"trackId": encode_track(i), "requesterId": "1"} for i in range(args.tracks)]
+    init_player = {
+        "op": "initPlayer", "guildId": "1", "tracks": tracks, "currentQueuePosition": 1,
+        "isPaused": False, "currentPosition": 0, "volume": 100, "repeatMode": "off"
+    }
+    print(f"{args.tracks}-track queue, per listener, deflate with context takeover after the initial initPlayer")
+    print(f"{'edit':<26} {'from the bot':>13} {'edit frame':>13} {'deflated':>13} {'full resync':>13} {'deflated':>13}")
+
+    for name, frame in edits(tracks, random.Random(args.seed)):
+        guild = Guild(None, "1")
+        guild.update_snapshot(copy.deepcopy(init_player))
+
+        frame = {**frame, "guildId": "1"}
+        bot_size = size(encode_payload(frame))
+        guild.update_snapshot(frame)
+        resync = guild.get_snapshot(guild)
+
+        edit_stream, resync_stream = DeflateStream(), DeflateStream()
+        for stream in (edit_stream, resync_stream):
+            stream.frame_size(encode_payload(init_player))
+
+        edit_data, resync_data = encode_payload(frame), encode_payload(resync)
+        print(
+            f"{name:<26} {kib(bot_size)} {kib(size(edit_data))} {kib(edit_stream.frame_size(edit_data))} "
+            f"{kib(size(resync_data))} {kib(resync_stream.frame_size(resync_data))}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,186 @@
+"""
+Relay benchmark against a live dashboard: local fake bots and browser
+clients connect over websockets, each bot streams frames for its guild and
+the browsers time when they arrive. Reports relayed messages per second
+and relay latency for each event loop implementation.
+
+    python bench/relay.py --guilds 4 --listeners 25
+    python bench/relay.py --loops uvloop --client-processes 4
+
+Latency is measured at a steady --rate of frames per guild, throughput by
+having every bot send a burst of --burst frames as fast as the server
+takes them. Clients share the machine with the server, so give them their
+own cores with --client-processes on a multi-core host.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import sys
+import time
+
+from typing import Any, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import aiohttp
+
+from server import DashboardServer
+
+def _percentile(values, percent: float) -> float:
+    return sorted(values)[min(len(values) - 1, int(len(values) * percent / 100))] if values else 0
+
+class Listener:
+    """A browser tab in the guild, recording how long each frame took to arrive."""
+    def __init__(self, websocket: aiohttp.ClientWebSocketResponse, burst: int):
+        self.websocket = websocket
+        self.latencies: List[float] = []
+        self.burst: int = burst
+        self.burst_received: int = 0
+        self.burst_done: asyncio.Event = asyncio.Event()
+        self.warm: asyncio.Event = asyncio.Event()
+
+    async def listen(self) -> None:
+        async for message in self.websocket:
+            if message.type != aiohttp.WSMsgType.TEXT:
+                continue
+            frame = json.loads(message.data)
+            phase = frame.get("phase")
+            if phase == "warmup":
+                self.warm.set()
+            elif phase == "latency":
+                self.latencies.append(time.perf_counter() - frame["sentAt"])
+            elif phase == "burst":
+                self.burst_received += 1
+                if self.burst_received == self.burst:
+                    self.burst_done.set()
+
+async def _drain(websocket: aiohttp.ClientWebSocketResponse) -> None:
+    # The bot ignores everything the dashboard asks of it
+    async for _ in websocket:
+        pass
+
+async def run_guild(session: aiohttp.ClientSession, target: Dict[str, Any], guild: int, args) -> Dict[str, Any]:
+    """Connect a bot and its listeners, then run the latency and burst phases for one guild."""
+    guild_id = str(guild + 1)
+    bot = await session.ws_connect(f"{target['ws_url']}/ws_bot", headers=target["bot_headers"][guild], max_msg_size=0)
+    tasks = [asyncio.create_task(_drain(bot))]
+
+    listeners, user_ids = [], []
+    for index in range(guild * args.listeners, (guild + 1) * args.listeners):
+        websocket = await session.ws_connect(f"{target['ws_url']}/ws_user", headers={"Cookie": target["cookies"][index]}, max_msg_size=0)
+        listener = Listener(websocket, args.burst)
+        tasks.append(asyncio.create_task(listener.listen()))
+        listeners.append(listener)
+        user_ids.append(target["user_ids"][index])
+
+    await bot.send_str(json.dumps({"op": "createPlayer", "guildId": guild_id, "memberIds": user_ids}))
+    # Keep poking until every listener is in the guild
+    while not all(listener.warm.is_set() for listener in listeners):
+        await bot.send_str(json.dumps({"op": "playerUpdate", "guildId": guild_id, "phase": "warmup"}))
+        await asyncio.sleep(0.05)
+
+    interval = 1 / args.rate
+    start = time.perf_counter()
+    for number in range(int(args.seconds * args.rate)):
+        await bot.send_str(json.dumps({"op": "playerUpdate", "guildId": guild_id, "phase": "latency", "sentAt": time.perf_counter(), "lastPosition": number}))
+        await asyncio.sleep(max(0, start + (number + 1) * interval - time.perf_counter()))
+    await asyncio.sleep(0.5)
+
+    # Not a state op, so neither coalesced nor dropped on the way
+    burst_start = time.perf_counter()
+    for number in range(args.burst):
+        await bot.send_str(json.dumps({"op": "benchFrame", "guildId": guild_id, "phase": "burst", "number": number}))
+    await asyncio.wait_for(asyncio.gather(*(listener.burst_done.wait() for listener in listeners)), 300)
+    burst_end = time.perf_counter()
+
+    for websocket in [bot] + [listener.websocket for listener in listeners]:
+        await websocket.close()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+    return {
+        "latencies": [latency for listener in listeners for latency in listener.latencies],
+        "expected": int(args.seconds * args.rate) * len(listeners),
+        "messages": args.burst * len(listeners),
+        "start": burst_start,
+        "end": burst_end
+    }
+
+async def run_guilds(target: Dict[str, Any], guilds: List[int], args) -> List[Dict[str, Any]]:
+    # Every websocket holds a connection for the whole run
+    async with aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=0)) as session:
+        return await asyncio.gather(*(run_guild(session, target, guild, args) for guild in guilds))
+
+def _client_process(target: Dict[str, Any], guilds: List[int], args, results) -> None:
+    results.put(asyncio.run(run_guilds(target, guilds, args)))
+
+def run_load(server: DashboardServer, args) -> Dict[str, float]:
+    """Drive every guild against the server, split over --client-processes, and sum up."""
+    target = {
+        "ws_url": server.ws_url,
+        "bot_headers": [server.bot_headers(f"bench-bot-{guild}") for guild in range(args.guilds)],
+        "cookies": [f"session={server.session_cookie(index)['session']}" for index in range(server.users)],
+        "user_ids": [server.user_id(index) for index in range(server.users)]
+    }
+
+    processes = max(1, min(args.client_processes, args.guilds))
+    if processes == 1:
+        guild_results = asyncio.run(run_guilds(target, list(range(args.guilds)), args))
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        queue = ctx.Queue()
+        workers = [
+            ctx.Process(target=_client_process, args=(target, list(range(index, args.guilds, processes)), args, queue))
+            for index in range(processes)
+        ]
+        for worker in workers:
+            worker.start()
+        guild_results = [result for _ in workers for result in queue.get()]
+        for worker in workers:
+            worker.join()
+
+    latencies = [latency for result in guild_results for latency in result["latencies"]]
+    elapsed = max(result["end"] for result in guild_results) - min(result["start"] for result in guild_results)
+    return {
+        "messages_per_second": sum(result["messages"] for result in guild_results) / elapsed,
+        "delivered": len(latencies) / max(1, sum(result["expected"] for result in guild_results)),
+        "p50": _percentile(latencies, 50),
+        "p99": _percentile(latencies, 99)
+    }
+
+def add_load_arguments(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--guilds", type=int, default=4, help="guilds, each with its own bot")
+    parser.add_argument("--listeners", type=int, default=25, help="browser clients per guild")
+    parser.add_argument("--rate", type=float, default=20, help="frames per second per guild in the latency phase")
+    parser.add_argument("--seconds", type=float, default=5, help="length of the latency phase")
+    parser.add_argument("--burst", type=int, default=2000, help="frames each bot sends in the throughput phase")
+    parser.add_argument("--client-processes", type=int, default=1)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_load_arguments(parser)
+    parser.add_argument("--loops", nargs="+", default=["asyncio", "uvloop"], choices=["asyncio", "uvloop"])
+    args = parser.parse_args()
+
+    print(f"{args.guilds} guilds x {args.listeners} listeners, {args.rate:.0f} frames/s per guild for latency, bursts of {args.burst}")
+    print(f"{'loop':<8} {'messages/s':>12} {'p50':>10} {'p99':>10} {'delivered':>10}")
+    for loop in args.loops:
+        # A large queue so the burst is measured rather than cut short by the slow consumer policy
+        server = DashboardServer(users=args.guilds * args.listeners, loop=loop, websocket={"queue_size": args.burst * 2})
+        try:
+            server.start()
+            if f"Using the {loop} event loop" not in server.log():
+                print(f"{loop:<8} not available, skipped")
+                continue
+            result = run_load(server, args)
+        finally:
+            server.stop()
+
+        print(
+            f"{loop:<8} {result['messages_per_second']:12.0f} {result['p50'] * 1000:7.1f} ms {result['p99'] * 1000:7.1f} ms "
+            f"{result['delivered'] * 100:9.1f}%"
+        )
+
+if __name__ == "__main__":
+    main()
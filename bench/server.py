@@ -0,0 +1,161 @@
+"""
+Runs the dashboard as its own process in a scratch directory, for the
+benchmarks that need a live server. The directory holds the settings, a
+generated GeoIP database and a user store with `users` logged in users,
+so pages and websockets work without reaching Discord.
+"""
+import ipaddress
+import os
+import secrets
+import signal
+import socket
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+from typing import Any, Dict, Optional
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT_DIR)
+
+from geoip import write_database
+from objects import UserPool
+from utils import VERSION_REQUIRED, json_dumps
+
+BOT_PASSWORD = "bench"
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+class DashboardServer:
+    def __init__(self, users: int = 0, workers: int = 1, loop: str = "asyncio", websocket: Optional[Dict[str, Any]] = None):
+        self.users: int = users
+        self.workers: int = workers
+        self.loop: str = loop
+        self.websocket: Dict[str, Any] = {"coalesce_interval": 0, **(websocket or {})}
+        self.port: int = _free_port()
+        self.secret_key: str = secrets.token_hex(16)
+        self.process: Optional[subprocess.Popen] = None
+        self._log = None
+        self._directory = tempfile.TemporaryDirectory(prefix="dashboard-bench-")
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    @property
+    def ws_url(self) -> str:
+        return f"ws://127.0.0.1:{self.port}"
+
+    @property
+    def directory(self) -> str:
+        return self._directory.name
+
+    @staticmethod
+    def user_id(index: int) -> str:
+        return str(100000000000000000 + index)
+
+    @staticmethod
+    def token(index: int) -> str:
+        return f"bench-token-{index}"
+
+    def session_cookie(self, index: int) -> Dict[str, str]:
+        """The session cookie of logged in user `index`, signed the way Quart does."""
+        from quart import Quart
+        from quart.sessions import SecureCookieSessionInterface
+
+        app = Quart("bench")
+        app.secret_key = self.secret_key
+        serializer = SecureCookieSessionInterface().get_signing_serializer(app)
+        return {"session": serializer.dumps({"discord_token": self.token(index)})}
+
+    @staticmethod
+    def bot_headers(bot_id: str) -> Dict[str, str]:
+        return {"Authorization": BOT_PASSWORD, "User-Id": bot_id, "Client-Version": VERSION_REQUIRED}
+
+    def _write_settings(self) -> None:
+        settings = {
+            "host": "127.0.0.1",
+            "port": str(self.port),
+            "password": BOT_PASSWORD,
+            "secret_key": self.secret_key,
+            "redirect_url": f"{self.url}/callback",
+            "workers": self.workers,
+            "loop": self.loop,
+            "version_check": False,
+            "user_cache": {"max_entries": max(10000, self.users * 2), "persist_path": os.path.join(self.directory, "users.db")},
+            "websocket": self.websocket,
+            "pubsub": {"backend": "memory"},
+            "logging": {"file": {"path": os.path.join(self.directory, "logs")}, "level": {"dashboard": "INFO"}}
+        }
+        with open(os.path.join(self.directory, "settings.json"), "w") as file:
+            file.write(json_dumps(settings))
+
+        os.makedirs(os.path.join(self.directory, "geolite_db"))
+        write_database(os.path.join(self.directory, "geolite_db", "GeoLite2-City.mmdb"), [(ipaddress.IPv4Network("127.0.0.0/8"), "US", "United States")])
+
+        db = sqlite3.connect(os.path.join(self.directory, "users.db"))
+        with db:
+            db.execute("CREATE TABLE users (id TEXT PRIMARY KEY, token_hash TEXT NOT NULL, data TEXT NOT NULL, expires_at REAL NOT NULL)")
+            db.execute("CREATE INDEX users_token_hash ON users (token_hash)")
+            db.executemany("INSERT INTO users VALUES (?, ?, ?, ?)", [
+                (self.user_id(index), UserPool._hash_token(self.token(index)),
+                 json_dumps({"id": self.user_id(index), "global_name": f"listener{index}", "avatar": None, "country": "US"}),
+                 time.time() + 3600)
+                for index in range(self.users)
+            ])
+        db.close()
+
+    def start(self, python_args=(), timeout: float = 120) -> float:
+        """Start the server and return the seconds until /health first answered."""
+        self._write_settings()
+        env = {key: value for key, value in os.environ.items() if key not in ("WORKERS", "LOOP", "PUBSUB_URL", "USER_STORE_PATH")}
+        self._log = open(os.path.join(self.directory, "server.log"), "w")
+        started = time.perf_counter()
+        self.process = subprocess.Popen(
+            [sys.executable, *python_args, os.path.join(ROOT_DIR, "main.py")],
+            cwd=self.directory,
+            env=env,
+            stdout=self._log,
+            stderr=subprocess.STDOUT
+        )
+        while time.perf_counter() - started < timeout:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"The server exited with {self.process.returncode}, see {self.log()}")
+            try:
+                with urllib.request.urlopen(f"{self.url}/health", timeout=1) as response:
+                    if response.status == 200:
+                        return time.perf_counter() - started
+            except OSError:
+                time.sleep(0.01)
+
+        self.stop()
+        raise RuntimeError(f"The server did not answer /health within {timeout}s")
+
+    def log(self) -> str:
+        with open(os.path.join(self.directory, "server.log")) as file:
+            return file.read()[-2000:]
+
+    def stop(self) -> None:
+        if self.process and self.process.poll() is None:
+            self.process.send_signal(signal.SIGINT)
+            try:
+                self.process.wait(30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        if self._log:
+            self._log.close()
+        self._directory.cleanup()
+
+    def __enter__(self) -> "DashboardServer":
+        self.start()
+        return self
+
+    def __exit__(self, *_) -> None:
+        self.stop()
@@ -0,0 +1,96 @@
+"""
+Startup time of the dashboard: importing main under -X importtime, and
+launching main.py until /health first answers, each the median of --runs.
+Exits with 1 when either is over its threshold, so it can gate a change
+that makes startup slower.
+
+    python bench/startup.py --runs 5 --max-import-ms 800 --max-startup-ms 2000
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from server import ROOT_DIR, DashboardServer
+
+def import_times(directory: str) -> Tuple[float, Dict[str, float]]:
+    """Milliseconds to import main, and to import each module main imports directly."""
+    env = {key: value for key, value in os.environ.items() if key not in ("PUBSUB_URL", "USER_STORE_PATH")}
+    process = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import sys; sys.path.insert(0, {ROOT_DIR!r}); import main"],
+        cwd=directory,
+        env=env,
+        capture_output=True,
+        text=True,
+        check=True
+    )
+
+    # Children are listed before their parent, which is one level less indented
+    total, children, pending = 0.0, {}, []
+    for line in process.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 0:
+            if name.strip() == "main":
+                total = int(cumulative) / 1000
+                children = {module: ms for module, ms, level in pending if level == 1}
+            pending = []
+        else:
+            pending.append((name.strip(), int(cumulative) / 1000, depth))
+    return total, children
+
+def time_to_health(runs: int) -> List[float]:
+    times = []
+    for _ in range(runs):
+        server = DashboardServer()
+        try:
+            times.append(server.start())
+        finally:
+            server.stop()
+    return times
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="direct imports of main to list")
+    parser.add_argument("--max-import-ms", type=float, default=800)
+    parser.add_argument("--max-startup-ms", type=float, default=2000)
+    args = parser.parse_args()
+
+    server = DashboardServer()
+    try:
+        server._write_settings()
+        # The first run fills the bytecode cache
+        import_times(server.directory)
+        results = [import_times(server.directory) for _ in range(args.runs)]
+    finally:
+        server.stop()
+
+    import_ms = statistics.median(total for total, _ in results)
+    children = {module: statistics.median(run[module] for _, run in results if module in run) for module in results[0][1]}
+    startup_ms = statistics.median(time_to_health(args.runs)) * 1000
+
+    print(f"import main           {import_ms:8.0f} ms  (max {args.max_import_ms:.0f} ms)")
+    for module, ms in sorted(children.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"  {module:<19}{ms:8.0f} ms")
+    print(f"first /health        {startup_ms:8.0f} ms  (max {args.max_startup_ms:.0f} ms)")
+
+    failed = [
+        name for name, value, limit in [("import", import_ms, args.max_import_ms), ("startup", startup_ms, args.max_startup_ms)]
+        if value > limit
+    ]
+    if failed:
+        print(f"Over the threshold: {', '.join(failed)}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
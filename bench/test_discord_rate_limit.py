@@ -0,0 +1,121 @@
+"""
+Tests requests_api and RateLimiter against a local fake Discord API that
+answers with scripted 429s and rate limit headers. A pass/fail test rather
+than a benchmark, run it with pytest or directly, which exits non-zero if
+any scenario fails.
+
+    python -m pytest bench/test_discord_rate_limit.py
+    python bench/test_discord_rate_limit.py
+"""
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import objects  # noqa: F401, utils can only be imported after objects
+import utils
+
+from fake_discord import FakeDiscord
+from utils import RateLimiter, close_http_session, requests_api
+
+def rate_limited(retry_after: float, is_global: bool = False):
+    headers = {"Retry-After": str(retry_after), "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": str(retry_after)}
+    if is_global:
+        headers["X-RateLimit-Global"] = "true"
+    return 429, headers, {"message": "You are being rate limited.", "retry_after": retry_after, "global": is_global}
+
+def reset_limiter() -> None:
+    RateLimiter._routes, RateLimiter._buckets, RateLimiter._global_reset = {}, {}, 0
+    utils._inflight_requests.clear()
+
+async def retries_after_429(discord: FakeDiscord) -> None:
+    discord.script("/api/users/@me", rate_limited(0.2), rate_limited(0.3))
+    start = time.monotonic()
+    result = await requests_api(f"{discord.base_url}/users/@me", headers={"Authorization": "Bearer a"})
+    elapsed = time.monotonic() - start
+
+    assert result and result["id"] == "1", f"expected the request to succeed, got {result!r}"
+    assert len(discord.calls["/api/users/@me"]) == 3, f"expected 3 upstream calls, got {len(discord.calls['/api/users/@me'])}"
+    assert elapsed >= 0.5, f"retried before Retry-After elapsed ({elapsed:.2f}s)"
+
+async def gives_up_on_long_retry_after(discord: FakeDiscord) -> None:
+    discord.script("/api/users/@me/guilds", rate_limited(utils.HTTP_MAX_RETRY_AFTER + 1))
+    result = await requests_api(f"{discord.base_url}/users/@me/guilds", headers={"Authorization": "Bearer a"})
+
+    assert result is None, f"expected None for a Retry-After above the cap, got {result!r}"
+    assert len(discord.calls["/api/users/@me/guilds"]) == 1
+
+async def global_limit_holds_other_routes(discord: FakeDiscord) -> None:
+    discord.script("/api/users/@me", rate_limited(0.4, is_global=True))
+    discord.script("/api/oauth2/token")
+
+    first = asyncio.create_task(requests_api(f"{discord.base_url}/users/@me", headers={"Authorization": "Bearer a"}))
+    await asyncio.sleep(0.1)
+    start = time.monotonic()
+    second = await requests_api(f"{discord.base_url}/oauth2/token", "POST", data={"code": "x"})
+    assert second is not None and await first is not None
+
+    waited = discord.calls["/api/oauth2/token"][0] - start
+    assert waited >= 0.2, f"a request went out during the global limit ({waited:.2f}s after it was queued)"
+
+async def bucket_exhaustion_waits_for_reset(discord: FakeDiscord) -> None:
+    headers = {"X-RateLimit-Bucket": "abc", "X-RateLimit-Remaining": "0", "X-RateLimit-Reset-After": "0.3"}
+    discord.script("/api/users/@me", (200, headers, {"id": "1"}))
+    await requests_api(f"{discord.base_url}/users/@me", headers={"Authorization": "Bearer b"})
+
+    start = time.monotonic()
+    await requests_api(f"{discord.base_url}/users/@me", headers={"Authorization": "Bearer b"})
+    assert time.monotonic() - start >= 0.25, "the second request did not wait for the exhausted bucket to reset"
+
+    # Buckets are per token, another user is not held back
+    start = time.monotonic()
+    discord.script("/api/users/@me", (200, headers, {"id": "2"}))
+    await requests_api(f"{discord.base_url}/users/@me", headers={"Authorization": "Bearer c"})
+    assert time.monotonic() - start < 0.2, "a different token waited on someone else's bucket"
+
+async def coalesces_identical_gets(discord: FakeDiscord) -> None:
+    discord.script("/api/users/@me")
+    discord.delay = 0.2
+    try:
+        results = await asyncio.gather(*[
+            requests_api(f"{discord.base_url}/users/@me", headers={"Authorization": "Bearer d"}) for _ in range(50)
+        ])
+        other = await requests_api(f"{discord.base_url}/users/@me", headers={"Authorization": "Bearer e"})
+    finally:
+        discord.delay = 0
+
+    assert all(result == results[0] for result in results) and other
+    assert results[0] is not results[1], "coalesced callers must get their own copy of the response"
+    assert len(discord.calls["/api/users/@me"]) == 2, f"expected 2 upstream calls, got {len(discord.calls['/api/users/@me'])}"
+
+async def main() -> int:
+    discord = FakeDiscord()
+    await discord.start()
+    failures = 0
+    try:
+        for scenario in (
+            retries_after_429,
+            gives_up_on_long_retry_after,
+            global_limit_holds_other_routes,
+            bucket_exhaustion_waits_for_reset,
+            coalesces_identical_gets
+        ):
+            reset_limiter()
+            try:
+                await scenario(discord)
+                print(f"PASS {scenario.__name__}")
+            except AssertionError as e:
+                failures += 1
+                print(f"FAIL {scenario.__name__}: {e}")
+    finally:
+        await close_http_session()
+        await discord.stop()
+    return failures
+
+def test_discord_rate_limits() -> None:
+    assert asyncio.run(main()) == 0
+
+if __name__ == "__main__":
+    sys.exit(1 if asyncio.run(main()) else 0)
@@ -0,0 +1,96 @@
+"""
+Bytes on the wire and relay CPU for sending a large queue to a client that
+asked the relay to decode tracks (tracks=decoded), compared with sending the
+encoded tracks alone.
+
+    python bench/track_info.py --tracks 10000
+"""
+import argparse
+import base64
+import functools
+import os
+import struct
+import sys
+import time
+import zlib
+
+from collections import OrderedDict
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import transformer
+
+from objects import User
+from utils import encode_payload, msgpack
+
+def _utf(value: str) -> bytes:
+    data = value.encode("utf-8")
+    return struct.pack(">H", len(data)) + data
+
+def _nullable_utf(value) -> bytes:
+    return b"\x00" if value is None else b"\x01" + _utf(value)
+
+def encode_track(index: int) -> str:
+    """Build a version 3 Lavalink track like the ones a YouTube search returns."""
+    identifier = f"{index:011d}"
+    body = (
+        b"\x03"
+        + _utf(f"Track number {index} (Official Music Video)")
+        + _utf(f"Artist {index % 500}")
+        + struct.pack(">Q", 180000 + index)
+        + _utf(identifier)
+        + b"\x00"
+        + _nullable_utf(f"https://www.youtube.com/watch?v={identifier}")
+        + _nullable_utf(f"https://i.ytimg.com/vi/{identifier}/mqdefault.jpg")
+        + _nullable_utf(None)
+        + _utf("youtube")
+        + struct.pack(">Q", 0)
+    )
+    return base64.b64encode(struct.pack(">i", len(body) | (1 << 30)) + body).decode()
+
+def _keyed_track_info(payload):
+    """The previous format: a map of encoded track -> decoded fields."""
+    return {**payload, "trackInfo": {track_id: transformer.decode(track_id) for track_id in transformer.track_ids(payload)}}
+
+def _measure(label: str, build, repeat: int) -> None:
+    elapsed = 0
+    for _ in range(repeat):
+        transformer.decode.cache_clear()
+        start = time.perf_counter()
+        payload = build()
+        data = encode_payload(payload)
+        elapsed += time.perf_counter() - start
+    elapsed = elapsed / repeat * 1000
+
+    size = len(data.encode() if isinstance(data, str) else data)
+    line = f"{label:<34} json {size / 1024:8.1f} KiB  deflate {len(zlib.compress(data.encode())) / 1024:7.1f} KiB"
+    if msgpack:
+        line += f"  msgpack {len(encode_payload(payload, 'msgpack')) / 1024:8.1f} KiB"
+    print(f"{line}  {elapsed:7.1f} ms")
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tracks", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    payload = {"op": "initPlayer", "guildId": "1", "tracks": [encode_track(i) for i in range(args.tracks)]}
+    user = SimpleNamespace(_sent_tracks=OrderedDict())
+    claim_tracks = functools.partial(User.claim_tracks, user)
+
+    print(f"{args.tracks} tracks, cold decode cache, mean of {args.repeat} runs (size, time to build + encode)")
+    _measure("encoded tracks only", lambda: payload, args.repeat)
+    _measure("trackInfo keyed by encoded track", lambda: _keyed_track_info(payload), args.repeat)
+    _measure("trackInfo list, first send", lambda: transformer.attach_track_info(payload), args.repeat)
+
+    def relay_send():
+        # What fan_out() does for a decoded_tracks recipient
+        missing = claim_tracks(transformer.track_ids(payload))
+        return transformer.attach_track_info(payload, set(missing)) if missing else payload
+
+    _measure("relay, first send", relay_send, 1)
+    _measure("relay, tracks already sent", relay_send, args.repeat)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""
+Cost of UserPool.get(token=...) as the registry grows, against the linear
+scan over every cached user that it replaced.
+
+    python bench/user_lookup.py --max-users 1000000
+"""
+import argparse
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from objects import UserPool
+
+def linear_scan(token: str):
+    """The lookup UserPool.get used before the token index."""
+    for user in UserPool._users.values():
+        if user.access_token == token:
+            return user
+
+def _per_lookup(lookup, tokens, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for token in tokens:
+            assert lookup(token) is not None
+    return (time.perf_counter() - start) / (repeat * len(tokens)) * 1e6
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--max-users", type=int, default=1000000)
+    parser.add_argument("--scan-limit", type=int, default=100000, help="largest registry to time the linear scan on")
+    args = parser.parse_args()
+
+    UserPool._max_entries = args.max_users
+    UserPool._idle_ttl = float("inf")
+
+    print(f"{'users':>9}  {'indexed get':>12}  {'linear scan':>12}")
+    size = 100
+    while size <= args.max_users:
+        for index in range(len(UserPool._users), size):
+            UserPool.add({"id": str(index), "global_name": f"user{index}", "access_token": f"token-{index}"})
+
+        # Spread lookups over the registry, the scan cost depends on where the user sits
+        tokens = [f"token-{index}" for index in range(0, size, max(1, size // 50))]
+        indexed = _per_lookup(lambda token: UserPool.get(token=token), tokens, 200)
+        scan = f"{_per_lookup(linear_scan, tokens, 1):9.1f} us" if size <= args.scan_limit else "skipped"
+        print(f"{size:>9}  {indexed:9.2f} us  {scan:>12}")
+        size *= 10
+
+if __name__ == "__main__":
+    main()
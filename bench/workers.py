@@ -0,0 +1,50 @@
+"""
+Throughput scaling over worker processes: the relay load from
+bench/relay.py against the dashboard served by 1, 2 and 4 workers, with
+bots and browsers routed between the workers through the pubsub broker.
+Reports relayed messages per second and the scaling efficiency against a
+single worker.
+
+    python bench/workers.py --workers 1 2 4 --client-processes 4
+
+Needs a core for every worker plus the clients to say anything about
+scaling, so run it outside a container limited to one or two cores.
+"""
+import argparse
+import os
+
+from relay import add_load_arguments, run_load
+from server import DashboardServer
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    add_load_arguments(parser)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--loop", default="asyncio", choices=["asyncio", "uvloop"])
+    args = parser.parse_args()
+
+    cores = len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count()
+    if cores < max(args.workers) + args.client_processes:
+        print(f"Only {cores} cores for {max(args.workers)} workers and {args.client_processes} client processes, the numbers will not scale")
+
+    print(f"{args.guilds} guilds x {args.listeners} listeners, bursts of {args.burst}, {args.loop}")
+    print(f"{'workers':>7} {'messages/s':>12} {'p50':>10} {'p99':>10} {'delivered':>10} {'efficiency':>11}")
+    single = None
+    for workers in args.workers:
+        server = DashboardServer(users=args.guilds * args.listeners, workers=workers, loop=args.loop, websocket={"queue_size": args.burst * 2})
+        try:
+            server.start()
+            result = run_load(server, args)
+        finally:
+            server.stop()
+
+        rate = result["messages_per_second"]
+        if single is None:
+            single = rate / workers
+        print(
+            f"{workers:>7} {rate:12.0f} {result['p50'] * 1000:7.1f} ms {result['p99'] * 1000:7.1f} ms "
+            f"{result['delivered'] * 100:9.1f}% {rate / (single * workers) * 100:10.0f}%"
+        )
+
+if __name__ == "__main__":
+    main()
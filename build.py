@@ -0,0 +1,240 @@
+import argparse
+import gzip
+import io
+import hashlib
+import json
+import logging
+import os
+
+from typing import (
+    Optional,
+    List,
+    Dict,
+    Any
+)
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+LOGGER = logging.getLogger("dashboard")
+
+ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSETS_DIR = os.path.join(ROOT_DIR, "assets")
+STATIC_DIR = os.path.join(ROOT_DIR, "static")
+MANIFEST_PATH = os.path.join(STATIC_DIR, "manifest.json")
+
+SCSS_DIR = os.path.join(ASSETS_DIR, "scss")
+JS_SOURCE_DIR = os.path.join(ASSETS_DIR, "js")
+
+TRANSLATIONS_DIR = os.path.join(ROOT_DIR, "translations")
+CATALOG_MANIFEST_PATH = os.path.join(TRANSLATIONS_DIR, ".manifest.json")
+CATALOG_DOMAIN = "messages"
+SOURCE_LANGUAGE = "en"
+
+# Bump to force a rebuild of every asset when the build steps change
+BUILD_VERSION = "1"
+FINGERPRINT_LENGTH = 10
+COMPRESSED_SUFFIXES = {"br": ".br", "gzip": ".gz"}
+
+def _hash(*chunks: bytes) -> str:
+    digest = hashlib.sha256(BUILD_VERSION.encode())
+    for chunk in chunks:
+        digest.update(chunk)
+    return digest.hexdigest()
+
+def _read(path: str) -> bytes:
+    with open(path, "rb") as file:
+        return file.read()
+
+def _write(path: str, data: bytes) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as file:
+        file.write(data)
+    os.replace(tmp_path, path)
+
+def _fingerprint(name: str, content: bytes) -> str:
+    """js/objects.min.js -> js/objects.<hash>.min.js"""
+    directory, filename = os.path.split(name)
+    stem, _, extension = filename.partition(".")
+    digest = hashlib.sha256(content).hexdigest()[:FINGERPRINT_LENGTH]
+    return f"{directory}/{stem}.{digest}.{extension}"
+
+def _remove(name: str) -> None:
+    path = os.path.join(STATIC_DIR, name)
+    for suffix in ("", *COMPRESSED_SUFFIXES.values()):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+def _emit(name: str, content: bytes) -> Dict[str, Any]:
+    """Write the fingerprinted asset with its precompressed variants."""
+    output = _fingerprint(name, content)
+    path = os.path.join(STATIC_DIR, output)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+
+    _write(path, content)
+    encodings = []
+    if brotli:
+        _write(path + COMPRESSED_SUFFIXES["br"], brotli.compress(content, quality=11))
+        encodings.append("br")
+
+    _write(path + COMPRESSED_SUFFIXES["gzip"], gzip.compress(content, compresslevel=9, mtime=0))
+    encodings.append("gzip")
+
+    return {"path": output, "encodings": encodings}
+
+def _is_built(entry: Optional[Dict[str, Any]], source_hash: str) -> bool:
+    return bool(entry) and entry["hash"] == source_hash and all(
+        os.path.exists(os.path.join(STATIC_DIR, entry["path"] + suffix))
+        for suffix in ("", *(COMPRESSED_SUFFIXES[encoding] for encoding in entry["encodings"]))
+    )
+
+# Build tools are imported only when something actually has to be rebuilt
+def _minify_js(path: str) -> bytes:
+    from jsmin import jsmin
+
+    with open(path, "r", encoding="utf-8") as source_file:
+        return jsmin(source_file.read(), quote_chars="'\"`").encode("utf-8")
+
+def _compile_scss(path: str) -> bytes:
+    import sass
+
+    return sass.compile(filename=path, include_paths=[SCSS_DIR], output_style="compressed").encode("utf-8")
+
+def _sources() -> List[tuple]:
+    """Return (asset name, source path, source hash, compiler) for every asset to build."""
+    sources = []
+    for js_file in sorted(os.listdir(JS_SOURCE_DIR)):
+        if js_file.endswith(".js"):
+            path = os.path.join(JS_SOURCE_DIR, js_file)
+            sources.append((f"js/{js_file[:-3]}.min.js", path, _hash(_read(path)), _minify_js))
+
+    # Entry points can import any other stylesheet, so they all share one hash of the whole directory
+    scss_files = sorted(file for file in os.listdir(SCSS_DIR) if file.endswith(".scss"))
+    scss_hash = _hash(*(file.encode() + _read(os.path.join(SCSS_DIR, file)) for file in scss_files))
+    for scss_file in scss_files:
+        if not scss_file.startswith("_"):
+            sources.append((f"css/{scss_file[:-5]}.css", os.path.join(SCSS_DIR, scss_file), scss_hash, _compile_scss))
+
+    return sources
+
+def _load_json(path: str) -> Dict[str, Dict[str, Any]]:
+    try:
+        with open(path, "r", encoding="utf-8") as file:
+            return json.load(file)
+    except (FileNotFoundError, ValueError):
+        return {}
+
+def load_manifest() -> Dict[str, Dict[str, Any]]:
+    return _load_json(MANIFEST_PATH)
+
+def build_assets(force: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Minify JavaScript and compile SCSS into fingerprinted files under static/,
+    with gzip (and brotli, if installed) variants. Assets whose sources are
+    unchanged since the last build are skipped. Returns the manifest mapping
+    each asset name (e.g. js/objects.min.js) to its built file.
+    """
+    previous = load_manifest()
+    manifest, built = {}, 0
+
+    for name, path, source_hash, compiler in _sources():
+        entry = previous.get(name)
+        if not force and _is_built(entry, source_hash):
+            manifest[name] = entry
+            continue
+
+        try:
+            manifest[name] = {"hash": source_hash, **_emit(name, compiler(path))}
+            built += 1
+            LOGGER.debug(f"Successfully built {name}.")
+        except Exception as e:
+            LOGGER.error(f"Error building {name}: {e}")
+            if entry:
+                manifest[name] = entry
+            continue
+
+        if entry and entry["path"] != manifest[name]["path"]:
+            _remove(entry["path"])
+
+    for name, entry in previous.items():
+        if name not in manifest:
+            _remove(entry["path"])
+
+    os.makedirs(STATIC_DIR, exist_ok=True)
+    _write(MANIFEST_PATH, json.dumps(manifest, indent=4, sort_keys=True).encode("utf-8"))
+    LOGGER.info(f"Finished building assets ({built} rebuilt, {len(manifest) - built} unchanged).")
+    return manifest
+
+def _catalog_paths(language_code: str) -> tuple:
+    directory = os.path.join(TRANSLATIONS_DIR, language_code, "LC_MESSAGES")
+    return os.path.join(directory, f"{CATALOG_DOMAIN}.po"), os.path.join(directory, f"{CATALOG_DOMAIN}.mo")
+
+def _catalog_languages() -> List[str]:
+    return sorted(language for language in os.listdir(TRANSLATIONS_DIR) if not language.startswith("."))
+
+def _language_entry(language_code: str, source_hash: Optional[str]) -> Dict[str, Any]:
+    from babel import Locale
+
+    locale = Locale.parse(language_code)
+    return {"hash": source_hash, "locale": str(locale), "name": locale.get_display_name(language_code).capitalize()}
+
+def compile_translations(force: bool = False) -> Dict[str, Dict[str, Any]]:
+    """
+    Compile every translations/<lang>/LC_MESSAGES/messages.po whose source
+    changed into messages.mo. The source hashes and each language's display
+    name and babel locale are recorded in translations/.manifest.json for
+    check_translations.
+    """
+    previous = _load_json(CATALOG_MANIFEST_PATH)
+    manifest = {SOURCE_LANGUAGE: previous.get(SOURCE_LANGUAGE) or _language_entry(SOURCE_LANGUAGE, None)}
+    built = 0
+
+    for language_code in _catalog_languages():
+        po_path, mo_path = _catalog_paths(language_code)
+        source_hash = _hash(_read(po_path))
+        entry = previous.get(language_code)
+        if not force and entry and entry["hash"] == source_hash and os.path.exists(mo_path):
+            manifest[language_code] = entry
+            continue
+
+        from babel.messages.mofile import write_mo
+        from babel.messages.pofile import read_po
+
+        with open(po_path, "rb") as po_file:
+            catalog = read_po(po_file, locale=language_code, domain=CATALOG_DOMAIN)
+        buffer = io.BytesIO()
+        write_mo(buffer, catalog)
+        _write(mo_path, buffer.getvalue())
+
+        manifest[language_code] = _language_entry(language_code, source_hash)
+        built += 1
+
+    _write(CATALOG_MANIFEST_PATH, json.dumps(manifest, indent=4, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    LOGGER.info(f"Finished compiling translations ({built} rebuilt, {len(manifest) - 1 - built} unchanged).")
+    return manifest
+
+def check_translations() -> Dict[str, Dict[str, Any]]:
+    """
+    Return the translation manifest, raising if any catalog is missing or was
+    compiled from an older messages.po, so requests never fall back to
+    untranslated text.
+    """
+    manifest = _load_json(CATALOG_MANIFEST_PATH)
+    for language_code in _catalog_languages():
+        po_path, mo_path = _catalog_paths(language_code)
+        entry = manifest.get(language_code)
+        if not entry or not os.path.exists(mo_path) or entry["hash"] != _hash(_read(po_path)):
+            raise RuntimeError(f"The {language_code} translation catalog is missing or stale, run `python build.py` to compile it.")
+
+    return manifest
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the dashboard's static assets and translation catalogs.")
+    parser.add_argument("--force", action="store_true", help="rebuild every asset even if its sources are unchanged")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    build_assets(force=args.force)
+    compile_translations(force=args.force)
@@ -1,51 +1,86 @@
 import asyncio
 import os
 import functools
+import hashlib
+import mimetypes
+import multiprocessing
+import secrets
+import signal
+import tempfile
+import threading
 import update
+import zlib
 
 from dotenv import load_dotenv
 from datetime import timedelta
+from markupsafe import escape
+from typing import Tuple, List, Dict, Any
 
 from hypercorn import Config
 from hypercorn.asyncio import serve
-from babel import Locale
+from hypercorn.asyncio.run import worker_serve
+from hypercorn.utils import wrap_app, check_multiprocess_shutdown_event
+from babel.support import Translations
 
 from quart_babel import Babel
 from quart import (
     Quart,
     render_template,
+    make_response,
     redirect,
     url_for,
     jsonify,
     session,
     websocket,
-    request
+    request,
+    send_from_directory
 )
 
 from objects import (
     Settings,
     UserPool,
     BotPool,
+    Guild,
+    Outbox,
+    RequestTracker,
+    ResultCache,
+    UserStore,
+    Cluster,
     User
 )
 
+from pubsub import BrokerServer, create_broker
+from build import (
+    STATIC_DIR,
+    TRANSLATIONS_DIR,
+    COMPRESSED_SUFFIXES,
+    build_assets,
+    compile_translations,
+    check_translations,
+    load_manifest
+)
+
 from utils import (
     DISCORD_API_BASE_URL,
-    ROOT_DIR,
     LANGUAGES,
+    LOGGER,
     get_locale,
+    get_encoding,
+    build_country_languages,
     requests_api,
-    process_js_files,
-    compile_scss,
     download_geoip_db,
+    close_http_session,
     check_country_with_ip,
+    open_geoip_reader,
+    close_geoip_reader,
     check_version,
+    install_event_loop,
     setup_logging
 )
 
 SETTINGS: Settings = Settings()
 
-app = Quart(__name__)
+app = Quart(__name__, static_folder=None)
 app.secret_key = SETTINGS.secret_key
 
 babel = Babel(app)
@@ -60,7 +95,7 @@ def login_required(func):
         if not token:
             return redirect(url_for('login'))
 
-        user = UserPool.get(token=token)
+        user = UserPool.get(token=token) or await UserPool.restore(token)
         if not user:
             resp = await requests_api(f'{DISCORD_API_BASE_URL}/users/@me', headers={'Authorization': f'Bearer {token}'})
             if resp:
@@ -72,22 +107,103 @@ def login_required(func):
         return await func(user, *args, **kwargs)
     return wrapper
 
+# Built asset name (e.g. js/objects.min.js) -> fingerprinted file and its precompressed encodings
+ASSETS: Dict[str, Dict[str, Any]] = {}
+STATIC_ENCODINGS: Dict[str, List[str]] = {}
+
+async def prepare() -> None:
+    build_assets()
+    compile_translations()
+    await download_geoip_db()
+
+def load_assets() -> None:
+    ASSETS.update(load_manifest())
+    STATIC_ENCODINGS.update({entry["path"]: entry["encodings"] for entry in ASSETS.values()})
+
+# Language code -> index.html split around the per-user placeholder, and the shell's ETag
+PAGE_SHELLS: Dict[str, Tuple[List[str], str]] = {}
+AVATAR_PLACEHOLDER = "__AVATAR_URL__"
+
+def load_translations() -> None:
+    """Fill LANGUAGES and load every compiled catalog into quart_babel's cache once."""
+    domain = babel.domain_instance
+    translations = domain.get_translations_cache()
+    for lang_code, entry in check_translations().items():
+        LANGUAGES[lang_code] = {"name": entry["name"]}
+        if entry["hash"]:
+            translations[entry["locale"], domain.domain[0]] = Translations.load(TRANSLATIONS_DIR, [lang_code], domain.domain[0])
+
+@app.template_global()
+def asset_url(filename: str) -> str:
+    entry = ASSETS.get(filename)
+    return url_for("static", filename=entry["path"] if entry else filename)
+
+async def get_page_shell(language_code: str) -> Tuple[List[str], str]:
+    """
+    Render index.html once per language with a placeholder where the user's
+    avatar goes, so requests only have to join in the per-user value.
+    """
+    if (shell := PAGE_SHELLS.get(language_code)) is None:
+        html = await render_template(
+            "index.html",
+            language_code=language_code,
+            avatar_url=AVATAR_PLACEHOLDER,
+            languages=LANGUAGES,
+            ws_encoding=get_encoding(SETTINGS.websocket.get("encoding")),
+            ws_decoded_tracks=SETTINGS.websocket.get("decoded_tracks", True)
+        )
+        shell = PAGE_SHELLS[language_code] = (html.split(AVATAR_PLACEHOLDER), hashlib.sha1(html.encode("utf-8")).hexdigest()[:16])
+    return shell
+
 @app.before_serving
 async def setup():
-    lang_codes = ["en"] + [
-        lang for lang in os.listdir(os.path.join(ROOT_DIR, "translations"))
-        if not lang.startswith(".")
-    ]
-    for lang_code in lang_codes:
-        LANGUAGES[lang_code] = {"name": Locale.parse(lang_code).get_display_name(lang_code).capitalize()}
+    if not multiprocessing.parent_process():
+        await prepare()
+    load_assets()
+    load_translations()
+    build_country_languages()
 
-    process_js_files()
-    compile_scss()
-    await download_geoip_db()
+    UserPool.configure(SETTINGS.user_cache)
+    UserStore.configure(SETTINGS.user_cache)
+    Outbox.configure(SETTINGS.websocket)
+    Guild.configure(SETTINGS.websocket)
+    RequestTracker.configure(SETTINGS.websocket)
+    ResultCache.configure(SETTINGS.result_cache)
+    open_geoip_reader()
+    await Cluster.start(create_broker(SETTINGS.pubsub))
+
+@app.after_serving
+async def shutdown():
+    await Cluster.stop()
+    await close_http_session()
+    close_geoip_reader()
+    UserStore.close()
 
 @app.route("/health", methods=["GET"])
 async def health():
-    return jsonify({"status": "ok"}), 200
+    return jsonify({"status": "ok", "users": UserPool.stats(), "outbox": Outbox.stats(), "results": ResultCache.stats()}), 200
+
+@app.route("/static/<path:filename>", endpoint="static", methods=["GET"])
+async def static_file(filename: str):
+    encodings = STATIC_ENCODINGS.get(filename)
+    if encodings is None:
+        return await send_from_directory(STATIC_DIR, filename)
+
+    # best_match honours the client's q-values, so an encoding sent with q=0 is never picked
+    if (encoding := request.accept_encodings.best_match(encodings)):
+        response = await send_from_directory(
+            STATIC_DIR, filename + COMPRESSED_SUFFIXES[encoding], mimetype=mimetypes.guess_type(filename)[0]
+        )
+        response.content_encoding = encoding
+    else:
+        response = await send_from_directory(STATIC_DIR, filename)
+
+    # Fingerprinted build output never changes under the same name
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.max_age = 31536000
+    response.cache_control.immutable = True
+    return response
 
 @app.route("/", methods=["GET"])
 async def home():
@@ -95,25 +211,39 @@ async def home():
     if not token:
         return redirect(url_for('login'))
     
-    user = UserPool.get(token=token)
+    user = UserPool.get(token=token) or await UserPool.restore(token)
 
     forwarded_for = request.headers.get('X-Forwarded-For')
     user_ip = forwarded_for.split(',')[0] if forwarded_for else request.remote_addr
-    country = await check_country_with_ip(user_ip)
 
     if not user:
         resp = await requests_api(f'{DISCORD_API_BASE_URL}/users/@me', headers={'Authorization': f'Bearer {token}'})
         if resp:
             resp["access_token"] = token
-            resp["country"] = country
+            resp["country"] = await check_country_with_ip(user_ip)
+            resp["ip_address"] = user_ip
             user = UserPool.add(resp)
         else:
             return redirect(url_for('login'))
 
-    else:
-        user.country = country
+    elif not user.country or user.ip_address != user_ip:
+        user.country = await check_country_with_ip(user_ip)
+        user.ip_address = user_ip
+        UserStore.save(user)
 
-    return await render_template("index.html", user=user, languages=LANGUAGES)
+    parts, shell_etag = await get_page_shell(get_locale())
+    avatar_url = str(escape(user.avatar.url))
+    etag = f"{shell_etag}-{zlib.crc32(avatar_url.encode('utf-8')):08x}"
+
+    if request.if_none_match.contains(etag):
+        response = await make_response("", 304)
+    else:
+        response = await make_response(avatar_url.join(parts))
+    
+    response.set_etag(etag)
+    response.cache_control.private = True
+    response.cache_control.no_cache = True
+    return response
 
 @app.route("/login", methods=["GET"])
 async def login():
@@ -128,7 +258,10 @@ async def login():
 @app.route('/logout', methods=["GET"])
 @login_required
 async def logout(user: User):
-    session.pop("discord_token", None)
+    token = session.pop("discord_token", None)
+    if token:
+        UserPool.logout(token)
+        await Cluster.logout(user.id)
     
     return redirect(url_for("home"))
 
@@ -184,16 +317,120 @@ async def ws_bot():
 @login_required
 async def ws_user(user: User):
     try:
-        await user.connect(websocket._get_current_object())
+        await user.connect(
+            websocket._get_current_object(),
+            decoded_tracks=websocket.args.get("tracks") == "decoded" and SETTINGS.websocket.get("decoded_tracks", True),
+            encoding=get_encoding(websocket.args.get("encoding"))
+        )
     except asyncio.CancelledError:
         raise
 
+def check_for_updates() -> None:
+    try:
+        update.check_version(with_msg=True, use_cache=True)
+    except Exception as e:
+        LOGGER.warning(f"Unable to check for a newer dashboard version: {e}")
+
+async def wait_for_shutdown(shutdown_event = None) -> None:
+    """
+    Return once the process is asked to stop, after sending what is still
+    queued and closing every websocket so clients reconnect (to another
+    worker, if any) instead of hanging until the graceful timeout.
+    """
+    stop = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, stop.set)
+        except NotImplementedError:
+            signal.signal(sig, lambda *_: loop.call_soon_threadsafe(stop.set))
+
+    if shutdown_event is not None:
+        watcher = asyncio.create_task(check_multiprocess_shutdown_event(shutdown_event, asyncio.sleep))
+        watcher.add_done_callback(lambda _: stop.set())
+
+    await stop.wait()
+    LOGGER.info("Shutting down, closing websocket connections...")
+    await UserPool.disconnect_all(1012, drain=True)
+    await BotPool.disconnect_all(1012, drain=True)
+
+def run_worker(config: Config, sockets, shutdown_event) -> None:
+    setup_logging(SETTINGS.logging)
+    install_event_loop(SETTINGS.loop)
+    asyncio.run(worker_serve(
+        wrap_app(app, config.wsgi_max_body_size, None),
+        config,
+        sockets=sockets,
+        shutdown_trigger=functools.partial(wait_for_shutdown, shutdown_event)
+    ))
+
+async def run_workers(config: Config) -> None:
+    """
+    Serve the app from SETTINGS.workers processes sharing the listening
+    sockets. Bots and users are routed between workers through the pubsub
+    broker; without one configured, a local BrokerServer is started here.
+    Workers share the user registry through the UserStore, a temporary one
+    unless user_cache.persist_path is set, so a user is only looked up on
+    Discord once whichever worker serves them.
+    """
+    await prepare()
+    await close_http_session()
+
+    broker = None
+    if SETTINGS.pubsub.get("backend", "memory") == "memory":
+        password = secrets.token_hex(16)
+        broker = BrokerServer(port=0, password=password)
+        await broker.start()
+        os.environ["PUBSUB_URL"] = f"redis://:{password}@{broker.host}:{broker.port}"
+
+    store_dir = None
+    if not SETTINGS.user_cache.get("persist_path"):
+        store_dir = tempfile.TemporaryDirectory(prefix="dashboard-")
+        os.environ["USER_STORE_PATH"] = os.path.join(store_dir.name, "users.db")
+
+    ctx = multiprocessing.get_context("spawn")
+    shutdown_event = ctx.Event()
+    sockets = config.create_sockets()
+    processes = [
+        ctx.Process(target=run_worker, args=(config, sockets, shutdown_event))
+        for _ in range(SETTINGS.workers)
+    ]
+    for process in processes:
+        process.start()
+    LOGGER.info(f"Started {len(processes)} workers.")
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        try:
+            loop.add_signal_handler(sig, shutdown_event.set)
+        except NotImplementedError:
+            signal.signal(sig, lambda *_: shutdown_event.set())
+
+    # Stop every worker as soon as one of them exits
+    joined = [loop.run_in_executor(None, process.join) for process in processes]
+    await asyncio.wait(joined, return_when=asyncio.FIRST_COMPLETED)
+    shutdown_event.set()
+    await asyncio.gather(*joined)
+
+    for sock in sockets.secure_sockets + sockets.insecure_sockets:
+        sock.close()
+    if broker:
+        await broker.close()
+    if store_dir:
+        store_dir.cleanup()
+
 if __name__ == "__main__":
-    update.check_version(with_msg=True)
     setup_logging(SETTINGS.logging)
+    if SETTINGS.version_check:
+        # Runs off the main thread so a slow or unreachable Github never delays startup
+        threading.Thread(target=check_for_updates, daemon=True).start()
     config = Config()
     config.bind = [f"{SETTINGS.host}:{SETTINGS.port}"]
-    asyncio.run(serve(app, config))
+    LOGGER.info(f"Using the {install_event_loop(SETTINGS.loop)} event loop.")
+    if SETTINGS.workers > 1:
+        asyncio.run(run_workers(config))
+    else:
+        asyncio.run(serve(app, config, shutdown_trigger=wait_for_shutdown))
 
     # For Testing
     # app.run(host=SETTINGS.host, port=SETTINGS.port, debug=True)
\ No newline at end of file
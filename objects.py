@@ -1,47 +1,461 @@
 import asyncio
+import hashlib
+import itertools
 import json
 import quart
 import os
+import sqlite3
+import sys
+import time
+import uuid
+import weakref
 
-from babel.languages import get_official_languages
 from geoip2 import records
 
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import (
     Optional,
+    Iterable,
+    Tuple,
+    Union,
+    List,
     Dict,
     Any,
 )
 
+from pubsub import Broker, MemoryBroker
+from transformer import CLIENT_CACHE_SIZE, attach_track_info, track_ids
 from utils import (
     DISCORD_API_BASE_URL,
-    LANGUAGES,
+    WS_SEND_TIMEOUT,
+    SUPERSEDABLE_OPS,
     LOGGER,
-    requests_api
+    requests_api,
+    get_country_language,
+    encode_payload,
+    json_dumps,
+    json_loads
 )
 
+async def _timed_send(recipient, data: Union[str, bytes], op: Optional[str], key: Optional[str] = None) -> None:
+    try:
+        await asyncio.wait_for(recipient.send_raw(data, op, key), WS_SEND_TIMEOUT)
+    except asyncio.TimeoutError:
+        LOGGER.warning(f"Timed out sending to {recipient!r}")
+    except Exception as e:
+        LOGGER.debug(f"Failed to send to {recipient!r}: {e}")
+
+async def fan_out(recipients: Iterable, payload: Dict) -> None:
+    """
+    Encode the payload once per distinct frame and send it to every
+    recipient concurrently. Recipients that decode tracks on the relay
+    share a frame when they are missing the same tracks. A slow or broken
+    connection only affects its own send and never the rest of the batch.
+    """
+    groups: Dict[Tuple[Optional[Tuple[str, ...]], str], List] = {}
+    remote: Dict[str, List[str]] = {}
+    ids = None
+    for recipient in recipients:
+        # Users on another process get one message per process, not one each
+        if isinstance(recipient, RemoteUser):
+            remote.setdefault(recipient.origin, []).append(recipient.id)
+            continue
+
+        missing = None
+        if getattr(recipient, "decoded_tracks", False):
+            if ids is None:
+                ids = track_ids(payload)
+            missing = recipient.claim_tracks(ids)
+        groups.setdefault((missing, getattr(recipient, "encoding", "json")), []).append(recipient)
+
+    sends, op, key = [], payload.get("op"), payload.get("guildId")
+    for (missing, encoding), group in groups.items():
+        data = encode_payload(attach_track_info(payload, set(missing)) if missing else payload, encoding)
+        # Queuing is immediate unless a blocking outbox is full, only those sends get a task and a timeout
+        sends.extend(_timed_send(recipient, data, op, key) for recipient in group if not recipient.send_raw_nowait(data, op, key))
+
+    if remote:
+        data = encode_payload(payload)
+        sends.extend(Cluster.deliver(origin, user_ids, data) for origin, user_ids in remote.items())
+    
+    if sends:
+        await asyncio.gather(*sends)
+
+class Outbox:
+    """
+    Bounded queue of encoded frames for one websocket, drained by its own
+    writer task. When the queue is full the overflow policy decides what
+    happens to the new frame:
+
+    - drop: replace an older queued state frame of the same op and key
+      (guild) with the new one, and disconnect the consumer if there is
+      none to replace.
+    - disconnect: close the slow consumer straight away.
+    - block: wait until the writer has made room.
+
+    Bot connections always block on their own, larger bound: a bot carries
+    every guild it serves and must never be dropped for being slow.
+    """
+    POLICIES = ("drop", "disconnect", "block")
+
+    _max_size: int = 256
+    _policy: str = "drop"
+    _bot_max_size: int = 4096
+    _drain_timeout: float = 2
+    _stats: Dict[str, int] = {"drops": 0, "disconnects": 0}
+    _instances: weakref.WeakSet = weakref.WeakSet()
+
+    def __init__(self, owner, websocket: quart.Websocket, max_size: Optional[int] = None, policy: Optional[str] = None):
+        self._owner = owner
+        self._websocket: quart.Websocket = websocket
+        self._max_size: int = max_size or Outbox._max_size
+        self._policy: str = policy or Outbox._policy
+        self._frames: deque[Tuple[Optional[str], Optional[str], Union[str, bytes]]] = deque()
+        self._ready: asyncio.Event = asyncio.Event()
+        self._space: asyncio.Event = asyncio.Event()
+        # Set while nothing is queued or being sent
+        self._idle: asyncio.Event = asyncio.Event()
+        self._idle.set()
+        self._closed: bool = False
+        self._task: asyncio.Task = asyncio.create_task(self._writer())
+
+        Outbox._instances.add(self)
+
+    @classmethod
+    def configure(cls, settings: Dict[str, Any]) -> None:
+        cls._max_size = settings.get("queue_size", cls._max_size)
+        if (policy := settings.get("overflow_policy", cls._policy)) not in cls.POLICIES:
+            raise ValueError(f"Unknown overflow policy: {policy}")
+        cls._policy = policy
+        cls._bot_max_size = settings.get("bot_queue_size", cls._bot_max_size)
+        cls._drain_timeout = settings.get("drain_timeout", cls._drain_timeout)
+
+    @classmethod
+    def for_bot(cls, owner, websocket: quart.Websocket) -> "Outbox":
+        return cls(owner, websocket, max_size=cls._bot_max_size, policy="block")
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        depths = [outbox.depth for outbox in cls._instances if not outbox._closed]
+        return {
+            "connections": len(depths),
+            "depth": sum(depths),
+            "max_depth": max(depths, default=0),
+            **cls._stats
+        }
+
+    @property
+    def depth(self) -> int:
+        return len(self._frames)
+
+    async def put(self, data: Union[str, bytes], op: Optional[str] = None, key: Optional[str] = None) -> None:
+        while not self.put_nowait(data, op, key):
+            self._space.clear()
+            await self._space.wait()
+
+    def put_nowait(self, data: Union[str, bytes], op: Optional[str] = None, key: Optional[str] = None) -> bool:
+        """Queue a frame without waiting. Returns False only if the block policy has to wait for room."""
+        if self._closed:
+            return True
+
+        if len(self._frames) >= self._max_size:
+            if self._policy == "block":
+                return False
+            if not self._make_room(op, key):
+                return True
+
+        self._frames.append((op, key, data))
+        self._idle.clear()
+        self._ready.set()
+        return True
+
+    def _make_room(self, op: Optional[str], key: Optional[str]) -> bool:
+        if self._policy == "drop" and op in SUPERSEDABLE_OPS:
+            # Only a newer frame of the same state may stand in for an older one
+            for index, (queued_op, queued_key, _) in enumerate(self._frames):
+                if queued_op == op and queued_key == key:
+                    del self._frames[index]
+                    Outbox._stats["drops"] += 1
+                    return True
+
+        LOGGER.warning(f"Disconnecting slow consumer {self._owner!r}, {len(self._frames)} frames pending.")
+        Outbox._stats["disconnects"] += 1
+        self.close()
+        asyncio.create_task(self._owner.disconnect())
+        return False
+
+    async def _writer(self) -> None:
+        try:
+            while True:
+                if not self._frames:
+                    self._ready.clear()
+                    self._idle.set()
+                    await self._ready.wait()
+                    continue
+                
+                _, _, data = self._frames.popleft()
+                self._space.set()
+
+                start = time.perf_counter()
+                await self._websocket.send(data)
+                self._owner.latency = time.perf_counter() - start
+
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            LOGGER.debug(f"Writer for {self._owner!r} stopped: {e}")
+            self.close()
+
+    async def drain(self) -> None:
+        """Give the writer up to drain_timeout seconds to send what is queued, then close."""
+        if not self._closed:
+            try:
+                await asyncio.wait_for(self._idle.wait(), self._drain_timeout)
+            except asyncio.TimeoutError:
+                LOGGER.debug(f"Dropping {len(self._frames)} frames for {self._owner!r} that were not sent in time.")
+        self.close()
+
+    def close(self) -> None:
+        self._closed = True
+        self._frames.clear()
+        self._space.set()
+        if self._task is not asyncio.current_task():
+            self._task.cancel()
+
+class ResultCache:
+    """
+    LRU of bot responses that don't depend on the user, keyed by op and the
+    track they were requested for. Bounded by entry count, age and bytes.
+    """
+    CACHED_OPS = ("getLyrics", "getRecommendation")
+    RESULT_KEYS = {"getLyrics": "lyrics", "getRecommendation": "tracks"}
+    # Stamped on the frame for the guild or user it was relayed to, never part of the result
+    STAMPED_KEYS = ("guildId", "seq", "snapshot", "isDj")
+
+    _entries: OrderedDict[Tuple[str, str], Tuple[float, int, Dict]] = OrderedDict()
+    _max_entries: int = 1000
+    _ttl: float = 3600
+    _max_bytes: int = 16 * 1024 * 1024
+    _bytes: int = 0
+    _stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0}
+
+    @classmethod
+    def configure(cls, settings: Dict[str, Any]) -> None:
+        cls._max_entries = settings.get("max_entries", cls._max_entries)
+        cls._ttl = settings.get("ttl", cls._ttl)
+        cls._max_bytes = settings.get("max_bytes", cls._max_bytes)
+
+    @classmethod
+    def key(cls, payload: Dict) -> Optional[Tuple[str, str]]:
+        if (op := payload.get("op")) in cls.CACHED_OPS:
+            identifier = payload.get("trackId") or payload.get("title")
+            return (op, identifier) if identifier else None
+
+    @classmethod
+    def get(cls, key: Tuple[str, str]) -> Optional[Dict]:
+        entry = cls._entries.get(key)
+        if entry and time.monotonic() - entry[0] > cls._ttl:
+            cls._remove(key)
+            entry = None
+
+        if not entry:
+            cls._stats["misses"] += 1
+            return None
+        
+        cls._stats["hits"] += 1
+        cls._entries.move_to_end(key)
+        return entry[2]
+
+    @classmethod
+    def put(cls, key: Tuple[str, str], data: Dict) -> None:
+        # Empty results are usually transient on the bot side, don't pin them
+        if not data.get(cls.RESULT_KEYS[key[0]]):
+            return
+        
+        result = {k: v for k, v in data.items() if k not in RequestTracker.USER_KEYS and k not in cls.STAMPED_KEYS}
+        size = len(json_dumps(result))
+        if size > cls._max_bytes:
+            return
+        
+        cls._remove(key)
+        cls._entries[key] = (time.monotonic(), size, result)
+        cls._bytes += size
+
+        while len(cls._entries) > cls._max_entries or cls._bytes > cls._max_bytes:
+            cls._remove(next(iter(cls._entries)))
+            cls._stats["evictions"] += 1
+
+    @classmethod
+    def _remove(cls, key: Tuple[str, str]) -> None:
+        if (entry := cls._entries.pop(key, None)):
+            cls._bytes -= entry[1]
+
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        return {"size": len(cls._entries), "bytes": cls._bytes, **cls._stats}
+
+class RequestTracker:
+    """
+    Correlates user requests sent to a bot with the bot's responses. Each
+    request is tagged with a requestId and expires after a timeout, and
+    identical read-only requests in flight share one bot call.
+    """
+    RESPONSE_OPS: Dict[str, str] = {
+        "getTracks": "getTracks",
+        "getRecommendation": "getRecommendation",
+        "getLyrics": "getLyrics",
+        "getPlaylist": "loadPlaylist"
+    }
+    SHARED_OPS = ("getTracks", "getRecommendation", "getLyrics")
+    USER_KEYS = ("userId", "callback", "requestId")
+
+    _timeout: float = 15
+
+    def __init__(self, bot):
+        self._bot = bot
+        self._requests: Dict[str, Dict[str, Any]] = {}
+        self._shared: Dict[Tuple, str] = {}
+        self._ids = itertools.count(1)
+
+    @classmethod
+    def configure(cls, settings: Dict[str, Any]) -> None:
+        cls._timeout = settings.get("request_timeout", cls._timeout)
+
+    async def send(self, payload: Dict) -> None:
+        op, waiter = payload.get("op"), (payload.get("userId"), payload.get("callback"))
+
+        if (cache_key := ResultCache.key(payload)) and (result := ResultCache.get(cache_key)):
+            return await self._notify([waiter], result)
+
+        key = None
+        if op in self.SHARED_OPS:
+            key = (op, json_dumps({k: v for k, v in payload.items() if k not in self.USER_KEYS}))
+            if (request_id := self._shared.get(key)):
+                self._requests[request_id]["waiters"].append(waiter)
+                return
+        
+        request_id = str(next(self._ids))
+        payload["requestId"] = request_id
+        self._requests[request_id] = {
+            "op": self.RESPONSE_OPS[op],
+            "key": key,
+            "cache_key": cache_key,
+            "waiters": [waiter],
+            "timer": asyncio.get_running_loop().call_later(self._timeout, self._expire, request_id)
+        }
+        if key:
+            self._shared[key] = request_id
+
+        await self._bot.send(payload)
+
+    def _pop(self, request_id: str) -> Optional[Dict[str, Any]]:
+        entry = self._requests.pop(request_id, None)
+        if entry:
+            entry["timer"].cancel()
+            if entry["key"]:
+                self._shared.pop(entry["key"], None)
+        return entry
+
+    def _match(self, data: Dict) -> Optional[str]:
+        # Fall back to the oldest request of this op for the user if the bot didn't echo the id,
+        # telling requests apart by the callback when the bot sent one back
+        callback = data.get("callback")
+        for request_id, entry in self._requests.items():
+            user_id, waiter_callback = entry["waiters"][0]
+            if entry["op"] == data.get("op") and user_id == data.get("userId") and (callback is None or callback == waiter_callback):
+                return request_id
+
+    def _expire(self, request_id: str) -> None:
+        if (entry := self._pop(request_id)):
+            LOGGER.warning(f"Bot ({self._bot.id}) did not answer {entry['op']} request {request_id} in time.")
+            asyncio.create_task(self._notify(entry["waiters"], {
+                "op": "errorMsg", "level": "error", "msg": "The bot did not respond in time. Please try again later!"
+            }))
+
+    async def _notify(self, waiters: List[Tuple], data: Dict) -> None:
+        # The bot's reply carries the seq of the user it answered, each waiter gets its own
+        guild = self._bot.get_guild(data.get("guildId")) if "seq" in data else None
+        for user_id, callback in waiters:
+            user = UserPool.resolve(user_id)
+            if user:
+                response = {**data, "userId": user_id}
+                if callback is not None:
+                    response["callback"] = callback
+                if guild:
+                    response["seq"] = guild.user_seq(user_id)
+                else:
+                    response.pop("seq", None)
+                await user.send(response)
+
+    async def resolve(self, data: Dict) -> bool:
+        """Deliver a bot response to every waiting user. Returns False if nothing was waiting for it."""
+        request_id = data.get("requestId")
+        if request_id not in self._requests:
+            request_id = self._match(data)
+
+        entry = self._pop(request_id) if request_id else None
+        if not entry:
+            return False
+        
+        data.pop("requestId", None)
+        if entry["cache_key"]:
+            ResultCache.put(entry["cache_key"], data)
+
+        # The callback the bot sent back belongs to the request it answered, not to later waiters
+        waiters = entry["waiters"]
+        if (callback := data.pop("callback", None)) is not None:
+            waiters = [(waiters[0][0], callback), *waiters[1:]]
+        await self._notify(waiters, data)
+        return True
+
 class Asset:
     def __init__(self, id: str, key: str):
         self.key: str = key
         self.url: str = f"https://cdn.discordapp.com/avatars/{id}/{key}.webp"
 
 class User:
+    # Minimum seconds between initBot broadcasts while the user has no bot
+    INIT_BOT_INTERVAL: float = 5
+
     def __init__(self, pool, data: Dict):
+        self._pool: UserPool = pool
+        # What this user adds to the pool's approx_bytes, see UserPool.account()
+        self._counted_bytes: int = 0
+
         self.id: str = data.get("id")
         self.name: str = data.get("global_name")
         self.avatar: Asset = Asset(self.id, data.get("avatar"))
-        self.access_token: str = data.get("access_token")
-        self.country: records.Country = data.get("country") 
+        self.country = data.get("country")
+        self.ip_address: Optional[str] = data.get("ip_address")
         
         self.bot: Optional[Bot] = None
         self.guild: Optional[Guild] = None
         
-        self._pool: UserPool = pool
+        self.latency: float = 0
+        self.decoded_tracks: bool = False
+        self.encoding: str = "json"
+
         self._websocket: Optional[quart.Websocket] = None
+        self._outbox: Optional[Outbox] = None
+        self._access_token: Optional[str] = None
+        self._last_active: float = time.monotonic()
+        self._bot_requested_at: float = 0
+
+        self._guilds: Optional[Dict[str, Dict]] = None
+        self._guilds_fetched_at: float = 0
+        self._guilds_refresh: Optional[asyncio.Task] = None
+        # Tracks already sent decoded, mirroring the client's TRACK_INFO_CACHE
+        self._sent_tracks: OrderedDict[str, None] = OrderedDict()
+
+        self.access_token = data.get("access_token")
     
     async def assign_bot(self, bot) -> None:
         if self.bot:
             if self.id in self.bot._users:
                 del self.bot._users[self.id]
+            if isinstance(self.bot, RemoteBot):
+                await self.bot.release(self)
             self.bot = None
         
         if self.guild:
@@ -66,16 +480,7 @@ class User:
 
         elif method == "getMutualGuilds":
             try:
-                resp: list[dict] = await requests_api(f'{DISCORD_API_BASE_URL}/users/@me/guilds', headers={'Authorization': f'Bearer {self.access_token}'})
-                guilds = {
-                    guild["id"]: {
-                        "avatar": f"https://cdn.discordapp.com/icons/{guild['id']}/{guild['icon']}.webp" if guild.get('icon') else None,
-                        "banner": f"https://cdn.discordapp.com/banners/{guild['id']}/{guild['banner']}.webp?size=480&quality=lossless" if guild.get('banner') else None,
-                        "name": guild['name']
-                    }
-                    for guild in resp if guild['permissions'] >= 1275593889
-                }
-                payload["guilds"] = guilds
+                payload["guilds"] = await self.get_mutual_guilds()
 
             except:
                 return await self.send({"op": "errorMsg", "level": "error", "msg": "Failed to retrieve guild information. Please try again later!"})
@@ -86,65 +491,217 @@ class User:
             return await self.guild.send_to_bot(payload)
         
         elif self.bot:
-            return await self.bot.send(payload)
+            return await self.bot.send_request(payload)
     
+    async def _fetch_mutual_guilds(self) -> Dict[str, Dict]:
+        token = self.access_token
+        resp: list[dict] = await requests_api(f'{DISCORD_API_BASE_URL}/users/@me/guilds', headers={'Authorization': f'Bearer {token}'})
+        guilds = {
+            guild["id"]: {
+                "avatar": f"https://cdn.discordapp.com/icons/{guild['id']}/{guild['icon']}.webp" if guild.get('icon') else None,
+                "banner": f"https://cdn.discordapp.com/banners/{guild['id']}/{guild['banner']}.webp?size=480&quality=lossless" if guild.get('banner') else None,
+                "name": guild['name']
+            }
+            for guild in resp if guild['permissions'] >= 1275593889
+        }
+
+        # Don't cache a result that belongs to a token which has since changed
+        if token == self.access_token:
+            self._guilds = guilds
+            self._guilds_fetched_at = time.monotonic()
+        return guilds
+
+    async def _refresh_mutual_guilds(self) -> None:
+        try:
+            await self._fetch_mutual_guilds()
+        except Exception as e:
+            LOGGER.debug(f"Failed to refresh guilds for user {self.id}: {e}")
+        finally:
+            self._guilds_refresh = None
+
+    async def get_mutual_guilds(self) -> Dict[str, Dict]:
+        """
+        Return the user's manageable guilds from cache. Entries older than the
+        TTL are still served while a background refresh runs, until they
+        exceed the max stale age and must be fetched inline again.
+        """
+        age = time.monotonic() - self._guilds_fetched_at
+        if self._guilds is not None:
+            if age <= self._pool._guilds_ttl:
+                return self._guilds
+            
+            if age <= self._pool._guilds_max_stale:
+                if not self._guilds_refresh:
+                    self._guilds_refresh = asyncio.create_task(self._refresh_mutual_guilds())
+                return self._guilds
+
+        return await self._fetch_mutual_guilds()
+
+    def invalidate_guilds(self) -> None:
+        self._guilds = None
+        self._guilds_fetched_at = 0
+
     async def send(self, payload: Dict) -> None:
-        if self._websocket:
-            await self._websocket.send_json(payload)
+        if self._outbox:
+            if self.decoded_tracks and (missing := self.claim_tracks(track_ids(payload))):
+                payload = attach_track_info(payload, set(missing))
+            await self.send_raw(encode_payload(payload, self.encoding), payload.get("op"), payload.get("guildId"))
+    
+    async def send_raw(self, data: Union[str, bytes], op: Optional[str] = None, key: Optional[str] = None) -> None:
+        if self._outbox:
+            await self._outbox.put(data, op, key)
+
+    def send_raw_nowait(self, data: Union[str, bytes], op: Optional[str] = None, key: Optional[str] = None) -> bool:
+        return not self._outbox or self._outbox.put_nowait(data, op, key)
+
+    def claim_tracks(self, ids: List[str]) -> Tuple[str, ...]:
+        """Return the tracks the client has not been sent decoded yet and mark them as sent."""
+        missing = tuple(track_id for track_id in ids if track_id not in self._sent_tracks)
+        for track_id in missing:
+            self._sent_tracks[track_id] = None
+        while len(self._sent_tracks) > CLIENT_CACHE_SIZE:
+            self._sent_tracks.popitem(last=False)
+        return missing
             
     async def _listen(self) -> None:
         while True:
-            if not self.bot:
+            if not self.bot and time.monotonic() - self._bot_requested_at >= self.INIT_BOT_INTERVAL:
+                self._bot_requested_at = time.monotonic()
                 await BotPool.broadcast({"op": "initBot", "userId": self.id})
 
             data = await self._websocket.receive()
-            await self.send_to_bot(json.loads(data))
+            await self.send_to_bot(json_loads(data))
                 
-    async def connect(self, websocket: quart.Websocket) -> None:
+    async def connect(self, websocket: quart.Websocket, decoded_tracks: bool = False, encoding: str = "json") -> None:
         if self._websocket:
             await self.disconnect()
             
         self._websocket = websocket
+        self.decoded_tracks = decoded_tracks
+        self.encoding = encoding
+        self._sent_tracks.clear()
+        self._outbox = outbox = Outbox(self, websocket)
                 
         LOGGER.info(f"User {self.name}({self.id}) has been connected!")
-        received = asyncio.create_task(self._listen())
-        await asyncio.gather(received)
+        try:
+            await Cluster.attach_user(self)
+            received = asyncio.create_task(self._listen())
+            await asyncio.gather(received)
+        finally:
+            outbox.close()
+            if self._websocket is websocket:
+                if isinstance(self.bot, RemoteBot):
+                    await self.bot.release(self)
+                self._websocket = self._outbox = None
+                self._pool.touch(self)
+                await Cluster.detach_user(self)
 
-    async def disconnect(self) -> None:
+    async def disconnect(self, code: int = 1004, drain: bool = False) -> None:
+        """Close the websocket, after sending what is still queued if `drain` is set."""
         if self._websocket:
             if self.guild:
                 await self.guild.remove_user(self)
             
+            if isinstance(self.bot, RemoteBot):
+                await self.bot.release(self)
             self.bot = None
-            await self._websocket.close(1004)
-            self._websocket = None
+            websocket, outbox, self._websocket, self._outbox = self._websocket, self._outbox, None, None
+            await outbox.drain() if drain else outbox.close()
+            await websocket.close(code)
+            self._pool.touch(self)
+            await Cluster.detach_user(self)
             LOGGER.info(f"User {self.name}({self.id}) has been disconnected!")
 
+    @property
+    def access_token(self) -> Optional[str]:
+        return self._access_token
+    
+    @access_token.setter
+    def access_token(self, token: Optional[str]) -> None:
+        self._pool._update_token(self, self._access_token, token)
+        if token != self._access_token:
+            self.invalidate_guilds()
+        self._access_token = token
+        self._pool.account(self)
+
     @property
     def is_connected(self) -> bool:
         return self._websocket
     
+    @property
+    def is_evictable(self) -> bool:
+        return not self._websocket and not self.guild
+    
+    @property
+    def approx_size(self) -> int:
+        """Rough number of bytes held by this user, used for cache accounting."""
+        size = sys.getsizeof(self) + sys.getsizeof(self.__dict__)
+        for value in (self.id, self.name, self._access_token, self.avatar.key, self.avatar.url):
+            size += sys.getsizeof(value)
+        if self.country:
+            size += sys.getsizeof(self.country)
+        return size
+    
+    @property
+    def country(self) -> Optional[records.Country]:
+        return self._country
+    
+    @country.setter
+    def country(self, country: Optional[records.Country]) -> None:
+        self._country = country
+        self._language_code = get_country_language(country.iso_code if country else None)
+        self._pool.account(self)
+
     @property
     def language_code(self) -> str:
-        language = get_official_languages(self.country.iso_code if self.country else "US")
-        return language[0] if language and language[0] in LANGUAGES else list(LANGUAGES.keys())[0]
+        return self._language_code
         
     def __repr__(self) -> str:
         return f"ID={self.id} Name={self.name}, Guild={self.guild}"
     
+QUEUE_OPS = ("addTrack", "moveTrack", "swapTrack", "removeTrack", "clearQueue", "shuffleTrack")
+
 class Guild:
+    _coalesce_interval: float = 0.1
+    # Seconds a user's DJ status is trusted after they leave, a later rejoin asks the bot again
+    _dj_status_ttl: float = 10
+
     def __init__(self, bot, guild_id: str):
         self.bot: Bot = bot
         self.id: str = guild_id
         
         self._users: Dict[str, User] = {}
+        self._pending: Dict[Tuple, Dict] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+
+        self._seq: int = 0
+        # Queue edits each user was skipped for, their seq runs behind by that much
+        self._withheld: Dict[str, int] = {}
+        self._snapshot: Optional[Dict] = None
+        self._snapshot_at: float = 0
+        self._dj_users: Dict[str, bool] = {}
+        self._left_at: Dict[str, float] = {}
+    
+    @classmethod
+    def configure(cls, settings: Dict[str, Any]) -> None:
+        cls._coalesce_interval = settings.get("coalesce_interval", cls._coalesce_interval)
+        cls._dj_status_ttl = settings.get("dj_status_ttl", cls._dj_status_ttl)
     
     async def add_user(self, user: User, init_player: bool = True) -> None:
         if not user.guild:
             user.guild = self
             self._users[user.id] = user
 
+            # The DJ role may have changed since a user left a while ago
+            left_at = self._left_at.pop(user.id, None)
+            if left_at is not None and time.monotonic() - left_at > self._dj_status_ttl:
+                self._dj_users.pop(user.id, None)
+
             if init_player:
+                # Only the bot knows whether a new user is a DJ, and its initPlayer carries the whole state anyway
+                if user.id in self._dj_users and (snapshot := self.get_snapshot(user)):
+                    return await user.send(snapshot)
+                
                 await self.bot.send({"op": "initPlayer", "userId": user.id})
         
     async def remove_user(self, user: User) -> None:
@@ -155,22 +712,220 @@ class Guild:
                 
             user.guild = None
             del self._users[user.id]
+            self._withheld.pop(user.id, None)
+
+            now = time.monotonic()
+            for user_id, left_at in list(self._left_at.items()):
+                if now - left_at > self._dj_status_ttl:
+                    del self._left_at[user_id]
+                    self._dj_users.pop(user_id, None)
+            if user.id in self._dj_users:
+                self._left_at[user.id] = now
     
     async def remove_all_user(self) -> None:
         for user_id, user in self._users.copy().items():
             await user.send({"op": "playerClose"})
             user.guild = None
             del self._users[user_id]
+        
+        self._snapshot = None
+        self._dj_users = {}
+        self._left_at = {}
+        self._withheld = {}
+    
+    def update_snapshot(self, payload: Dict) -> None:
+        """
+        Keep the guild's player state current from the frames the bot sends.
+        Every queue edit bumps the guild's sequence number and each frame is
+        stamped with it, so clients can spot a stale snapshot or a missed edit.
+        Users in skip_users don't count an edit they never receive, see
+        user_seq().
+        """
+        op = payload.get("op")
+        if op in QUEUE_OPS:
+            self._seq += 1
+            for user_id in payload.get("skip_users", []):
+                self._withheld[user_id] = self._withheld.get(user_id, 0) + 1
+        payload["seq"] = self.user_seq(payload["userId"]) if payload.get("userId") else self._seq
+
+        if op == "initPlayer":
+            if "isDj" in payload and payload.get("userId"):
+                self._dj_users[payload["userId"]] = payload["isDj"]
+
+            snapshot = {key: value for key, value in payload.items() if key not in ("userId", "isDj", "seq")}
+            snapshot["tracks"] = list(snapshot.get("tracks", []))
+            self._snapshot, self._snapshot_at = snapshot, time.monotonic()
+            return
+        
+        if (snapshot := self._snapshot) is None:
+            return
+        
+        tracks: List[Dict] = snapshot["tracks"]
+        base = (snapshot.get("currentQueuePosition") or 1) - 1
+        try:
+            if op == "trackUpdate":
+                snapshot["currentQueuePosition"] = payload.get("currentQueuePosition")
+                snapshot["isPaused"] = payload.get("isPaused")
+                snapshot["currentPosition"] = 0
+                self._snapshot_at = time.monotonic()
+            
+            elif op == "addTrack":
+                new_tracks = [{"trackId": track_id, "requesterId": payload.get("requesterId")} for track_id in payload.get("tracks", [])]
+                position = payload.get("position") or 0
+                if position >= 1:
+                    tracks[base + position:base + position] = new_tracks
+                else:
+                    tracks.extend(new_tracks)
+            
+            elif op == "moveTrack":
+                moved = tracks.pop(base + payload["movedTrack"]["index"])
+                if moved.get("trackId") != payload["movedTrack"].get("trackId"):
+                    raise ValueError("moved track mismatch")
+                tracks.insert(base + payload["newIndex"], moved)
+            
+            elif op == "swapTrack":
+                first, second = base + payload["index1"]["index"], base + payload["index2"]["index"]
+                tracks[first], tracks[second] = tracks[second], tracks[first]
+            
+            elif op == "removeTrack":
+                for index in sorted(payload["indexes"], reverse=True):
+                    del tracks[index]
+            
+            elif op == "clearQueue":
+                if payload.get("queueType") == "queue":
+                    del tracks[base + 1:]
+                elif payload.get("queueType") == "history":
+                    del tracks[:base]
+                    snapshot["currentQueuePosition"] = 1
+            
+            elif op == "shuffleTrack":
+                self._apply_shuffle(payload, tracks, base)
+
+            elif op == "updateVolume":
+                snapshot["volume"] = payload.get("volume")
+            
+            elif op == "updatePause":
+                snapshot["currentPosition"] = self._snapshot_position()
+                snapshot["isPaused"] = payload.get("pause")
+                self._snapshot_at = time.monotonic()
+            
+            elif op in ("playerUpdate", "updatePosition"):
+                snapshot["currentPosition"] = payload.get("lastPosition" if op == "playerUpdate" else "position")
+                self._snapshot_at = time.monotonic()
+            
+            elif op == "repeatTrack":
+                snapshot["repeatMode"] = payload.get("repeatMode")
+            
+            elif op == "toggleAutoplay":
+                snapshot["autoplay"] = payload.get("status")
+            
+            elif op == "updateGuild":
+                snapshot["channelName"] = payload.get("channelName", snapshot.get("channelName"))
+                user = payload.get("user", {})
+                snapshot["users"] = [member for member in snapshot.get("users", []) if member.get("userId") != user.get("userId")]
+                if payload.get("isJoined"):
+                    snapshot["users"].append(user)
+            
+            elif op in ("updateFilter", "playerClose"):
+                self._snapshot = None
+
+        except (KeyError, IndexError, TypeError, ValueError) as e:
+            # The model drifted from the bot, the next joiner asks the bot again
+            LOGGER.debug(f"Dropping player snapshot of guild {self.id} on {op}: {e}")
+            self._snapshot = None
+    
+    def _apply_shuffle(self, payload: Dict, tracks: List[Dict], base: int) -> None:
+        """
+        Apply a shuffle to the snapshot and, when the new order is a
+        permutation of the old one, replace the frame's tracks with the
+        list of old indexes so the whole section isn't sent again.
+        """
+        section = slice(base + 1, None) if payload.get("queueType") == "queue" else slice(0, base)
+        old_tracks, new_tracks = tracks[section], list(payload.get("tracks") or [])
+        tracks[section] = new_tracks
+
+        positions: Dict[Tuple, List[int]] = {}
+        for index, track in enumerate(old_tracks):
+            positions.setdefault((track.get("trackId"), track.get("requesterId")), []).append(index)
+        
+        order = []
+        for track in new_tracks:
+            indexes = positions.get((track.get("trackId"), track.get("requesterId")))
+            if not indexes:
+                return
+            order.append(indexes.pop())
+        
+        if len(order) == len(old_tracks):
+            del payload["tracks"]
+            payload["order"] = order
+
+    def _snapshot_position(self) -> int:
+        position = self._snapshot.get("currentPosition") or 0
+        if not self._snapshot.get("isPaused"):
+            position += int((time.monotonic() - self._snapshot_at) * 1000)
+        return position
+    
+    def user_seq(self, user_id: str) -> int:
+        return self._seq - self._withheld.get(user_id, 0)
+
+    def get_snapshot(self, user: User) -> Optional[Dict]:
+        if not self._snapshot:
+            return None
+        
+        return {
+            **self._snapshot,
+            "currentPosition": self._snapshot_position(),
+            "isDj": self._dj_users.get(user.id, False),
+            "userId": user.id,
+            "seq": self.user_seq(user.id),
+            "snapshot": True
+        }
             
     async def broadcast(self, payload: Dict) -> None:
         skip_users = payload.get("skip_users", [])
-        for user_id, user in self._users.items():
-            if user_id not in skip_users:
-                await user.send(payload)
+        recipients = [user for user_id, user in self._users.items() if user_id not in skip_users]
+        if "seq" not in payload or not self._withheld:
+            return await fan_out(recipients, payload)
+
+        # Users that were skipped for an edit are behind the guild's seq
+        groups: Dict[int, List[User]] = {}
+        for user in recipients:
+            groups.setdefault(self.user_seq(user.id), []).append(user)
+        await asyncio.gather(*(fan_out(group, {**payload, "seq": seq}) for seq, group in groups.items()))
     
+    async def relay(self, payload: Dict) -> None:
+        """
+        Broadcast a frame from the bot. State frames are held back and only
+        the latest one per op is sent on the next tick, while any other frame
+        first flushes what is pending so the overall order is kept.
+        """
+        if self._coalesce_interval <= 0 or payload.get("op") not in SUPERSEDABLE_OPS:
+            await self.flush()
+            return await self.broadcast(payload)
+        
+        key = (payload.get("op"), tuple(payload.get("skip_users", [])))
+        self._pending.pop(key, None)
+        self._pending[key] = payload
+
+        if not self._flush_task:
+            self._flush_task = asyncio.create_task(self._flush_later())
+    
+    async def _flush_later(self) -> None:
+        await asyncio.sleep(self._coalesce_interval)
+        self._flush_task = None
+        await self.flush()
+    
+    async def flush(self) -> None:
+        if not self._pending:
+            return
+        
+        pending, self._pending = list(self._pending.values()), {}
+        for payload in pending:
+            await self.broadcast(payload)
+
     async def send_to_bot(self, data: Dict) -> None:
         data["guildId"] = self.id
-        await self.bot.send(data)
+        await self.bot.send_request(data)
         
 class Bot:
     def __init__(
@@ -180,28 +935,43 @@ class Bot:
         websocket: quart.Websocket
     ):  
         self.id: str = headers.get("User-Id")
+        self.latency: float = 0
+
         self._websocket: quart.Websocket = websocket
+        self._outbox: Outbox = Outbox.for_bot(self, websocket)
         self._pool: BotPool = pool
 
         self._guilds: Dict[str, Guild] = {}
         self._users: Dict[str, User] = {}
+        self._requests: RequestTracker = RequestTracker(self)
     
     async def broadcast(self, payload: Dict):
         try:
-            for guild in self._guilds.values():
-                await guild.broadcast(payload)
+            await asyncio.gather(*[guild.broadcast(payload) for guild in self._guilds.values()])
         except Exception as e:
             LOGGER.error("Something wrong while broadcast to the bot.", e)
     
     async def send(self, payload: Dict) -> None:
         if self.is_connected:
             LOGGER.debug(f"Bot ({self.id}) sending message: {payload}")
-            await self._websocket.send_json(payload)
+            await self.send_raw(encode_payload(payload), payload.get("op"), payload.get("guildId"))
+    
+    async def send_raw(self, data: Union[str, bytes], op: Optional[str] = None, key: Optional[str] = None) -> None:
+        if self.is_connected:
+            await self._outbox.put(data, op, key)
+
+    def send_raw_nowait(self, data: Union[str, bytes], op: Optional[str] = None, key: Optional[str] = None) -> bool:
+        return not self.is_connected or self._outbox.put_nowait(data, op, key)
+    
+    async def send_request(self, payload: Dict) -> None:
+        if payload.get("op") in RequestTracker.RESPONSE_OPS:
+            return await self._requests.send(payload)
+        await self.send(payload)
     
     async def _listen(self):
         while True:
             data = await self._websocket.receive()
-            data: Dict = json.loads(data)
+            data: Dict = json_loads(data)
             LOGGER.debug(f"Bot ({self.id}) receiving message: {data}")
             
             method = data.get("op")
@@ -215,22 +985,27 @@ class Bot:
 
                 if not guild.bot:
                     guild.bot = self
+                
+                # Held back state frames go out stamped with the seq from before this edit
+                if method in QUEUE_OPS:
+                    await guild.flush()
+                guild.update_snapshot(data)
             
                 if method == "updateGuild":
-                    user: User = UserPool.get(user_id=data.get("user", {}).get("userId"))
+                    user: User = UserPool.resolve(data.get("user", {}).get("userId"))
                     if user:
                         await guild.add_user(user) if data.get("isJoined") else await guild.remove_user(user)
                 
                 elif method == "createPlayer":
                     for member_id in data.get("memberIds", []):
-                        user = UserPool.get(user_id=member_id)
+                        user = UserPool.resolve(member_id)
                         if user:
                             await guild.add_user(user)
                     
                     continue
                 
                 elif method == "initPlayer":
-                    user: User = UserPool.get(user_id=data.get("userId"))
+                    user: User = UserPool.resolve(data.get("userId"))
                     if user:
                         await guild.add_user(user, init_player=False)
 
@@ -239,18 +1014,23 @@ class Bot:
                     if guild:
                         await guild.remove_all_user()
 
+            if method in RequestTracker.RESPONSE_OPS.values() and await self._requests.resolve(data):
+                continue
+
             if user_id := data.get("userId"):
-                user = UserPool.get(user_id=user_id)
+                user = UserPool.resolve(user_id)
                 if user:
                     await user.send(data)
                 
             else:
-                await guild.broadcast(data)
+                await guild.relay(data)
 
-    async def disconnect(self) -> None:
+    async def disconnect(self, code: int = 1004, drain: bool = False) -> None:
+        """Close the websocket, after sending what is still queued if `drain` is set."""
         if self._websocket:
-            await self._websocket.close(1004)
-            self._websocket = None
+            websocket, self._websocket = self._websocket, None
+            await self._outbox.drain() if drain else self._outbox.close()
+            await websocket.close(code)
             
             for guild in self._guilds.values():
                 await guild.remove_all_user()
@@ -261,6 +1041,7 @@ class Bot:
             self._guilds = {}
             self._users = {}
 
+            await Cluster.detach_bot(self)
             LOGGER.info(f"Bot ({self.id}) has been disconnected!")
 
     def create_guild(self, guild_id: str) -> Guild:
@@ -287,16 +1068,18 @@ class BotPool:
         try:
             header = websocket.headers
             
-            bot: Bot = cls.get(bot_id)
+            bot: Bot = cls._bots.get(bot_id)
             if bot:
                 if bot.is_connected:
                     await bot.disconnect()
                 bot._websocket = websocket
+                bot._outbox = Outbox.for_bot(bot, websocket)
             else:  
                 bot = Bot(cls, header, websocket)
                 cls._bots[bot_id] = bot
             
             LOGGER.info(f"Bot ({bot.id}) has been connected!")
+            await Cluster.attach_bot(bot)
 
             received = asyncio.create_task(bot._listen())
             await asyncio.gather(received)
@@ -305,32 +1088,533 @@ class BotPool:
             raise
     
     @classmethod
-    def get(cls, bot_id: str) -> Optional[Bot]:
-        return cls._bots.get(bot_id)
+    def get(cls, bot_id: str) -> Optional[Union[Bot, "RemoteBot"]]:
+        bot = cls._bots.get(bot_id)
+        if bot and bot.is_connected:
+            return bot
+        return Cluster.remote_bot(bot_id) or bot
     
     @classmethod
     async def broadcast(cls, data: Dict) -> None:
-        for bot in cls._bots.values():
-            await bot.send(data)
+        await fan_out(list(cls._bots.values()), data)
+        await Cluster.broadcast_bots(data)
+    
+    @classmethod
+    async def disconnect_all(cls, code: int = 1004, drain: bool = False) -> None:
+        await asyncio.gather(*[bot.disconnect(code, drain) for bot in list(cls._bots.values()) if bot.is_connected], return_exceptions=True)
             
+class UserStore:
+    """
+    Optional SQLite snapshot of the user registry, so users coming back after
+    a restart are restored without another call to Discord. Rows are keyed by
+    user id, looked up by the sha256 of the access token (the token itself is
+    never stored) and expire `ttl` seconds after they were last written.
+    Neither the token nor the user's IP address is stored. Queries run on
+    one background thread so they never block the event loop and writes are
+    applied in order.
+    """
+    _db: Optional[sqlite3.Connection] = None
+    _executor: Optional[ThreadPoolExecutor] = None
+    _ttl: float = 7 * 24 * 60 * 60
+    # Seconds a query waits for another worker's write lock before giving up
+    _busy_timeout: float = 1
+
+    @classmethod
+    def configure(cls, settings: Dict[str, Any]) -> None:
+        cls._ttl = settings.get("persist_ttl", cls._ttl)
+        if (path := settings.get("persist_path")):
+            cls.open(path)
+
+    @classmethod
+    def open(cls, path: str) -> None:
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        cls._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="user-store")
+        cls._db = sqlite3.connect(path, timeout=cls._busy_timeout, isolation_level=None, check_same_thread=False)
+        cls._db.execute("PRAGMA journal_mode=WAL")
+        cls._db.execute("PRAGMA synchronous=NORMAL")
+        cls._db.execute(
+            "CREATE TABLE IF NOT EXISTS users ("
+            "id TEXT PRIMARY KEY, token_hash TEXT NOT NULL, data TEXT NOT NULL, expires_at REAL NOT NULL)"
+        )
+        cls._db.execute("CREATE INDEX IF NOT EXISTS users_token_hash ON users (token_hash)")
+        cls._execute("DELETE FROM users WHERE expires_at < ?", (time.time(),))
+
+    @classmethod
+    def close(cls) -> None:
+        if cls._executor:
+            cls._executor.shutdown(wait=True)
+            cls._executor = None
+        if cls._db:
+            cls._db.close()
+            cls._db = None
+
+    @classmethod
+    def _submit(cls, query: str, params: Tuple = ()) -> asyncio.Future:
+        return asyncio.get_running_loop().run_in_executor(cls._executor, cls._execute, query, params)
+
+    @classmethod
+    def _execute(cls, query: str, params: Tuple = ()) -> Optional[sqlite3.Cursor]:
+        try:
+            return cls._db.execute(query, params)
+        except sqlite3.Error as e:
+            LOGGER.error("Unable to access the user store.", exc_info=e)
+
+    @classmethod
+    def save(cls, user: "User") -> None:
+        """Write the user in the background."""
+        if not cls._db or not user.access_token:
+            return
+
+        data = {
+            "id": user.id,
+            "global_name": user.name,
+            "avatar": user.avatar.key,
+            "country": user.country.iso_code if user.country else None
+        }
+        cls._submit(
+            "INSERT OR REPLACE INTO users (id, token_hash, data, expires_at) VALUES (?, ?, ?, ?)",
+            (user.id, UserPool._hash_token(user.access_token), json_dumps(data), time.time() + cls._ttl)
+        )
+
+    @classmethod
+    def _fetch_data(cls, token_hash: str) -> Optional[str]:
+        cursor = cls._execute("SELECT data FROM users WHERE token_hash = ? AND expires_at > ?", (token_hash, time.time()))
+        row = cursor.fetchone() if cursor else None
+        return row[0] if row else None
+
+    @classmethod
+    async def load(cls, token: str) -> Optional[Dict[str, Any]]:
+        """Return the stored user data for an access token, ready for UserPool.add."""
+        if not cls._db:
+            return None
+
+        row = await asyncio.get_running_loop().run_in_executor(cls._executor, cls._fetch_data, UserPool._hash_token(token))
+        if not row:
+            return None
+
+        data = json_loads(row)
+        data["access_token"] = token
+        data["country"] = records.Country(["en"], iso_code=data["country"]) if data.get("country") else None
+        return data
+
+    @classmethod
+    def delete(cls, user_id: str) -> None:
+        if cls._db:
+            cls._submit("DELETE FROM users WHERE id = ?", (user_id,))
+
 class UserPool:
-    _users: Dict[str, User] = {}
+    _users: OrderedDict[str, User] = OrderedDict()
+    _tokens: Dict[str, str] = {}
+
+    _max_entries: int = 10000
+    _idle_ttl: float = 3600
+    _guilds_ttl: float = 60
+    _guilds_max_stale: float = 600
+    _stats: Dict[str, int] = {"hits": 0, "misses": 0, "evictions": 0, "restored": 0}
+    _bytes: int = 0
     
+    @classmethod
+    def configure(cls, settings: Dict[str, Any]) -> None:
+        cls._max_entries = settings.get("max_entries", cls._max_entries)
+        cls._idle_ttl = settings.get("idle_ttl", cls._idle_ttl)
+        cls._guilds_ttl = settings.get("guilds_ttl", cls._guilds_ttl)
+        cls._guilds_max_stale = settings.get("guilds_max_stale", cls._guilds_max_stale)
+    
+    @staticmethod
+    def _hash_token(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def _update_token(cls, user: User, old_token: Optional[str], new_token: Optional[str]) -> None:
+        if old_token:
+            old_key = cls._hash_token(old_token)
+            if cls._tokens.get(old_key) == user.id:
+                del cls._tokens[old_key]
+        
+        if new_token:
+            cls._tokens[cls._hash_token(new_token)] = user.id
+
+    @classmethod
+    async def restore(cls, token: str) -> Optional[User]:
+        """Bring back a user from the UserStore after a restart or eviction."""
+        if (data := await UserStore.load(token)) and not cls._tokens.get(cls._hash_token(token)):
+            cls._stats["restored"] += 1
+            return cls.add(data)
+        return cls.get(token=token)
+
     @classmethod
     def add(cls, data: Dict) -> User:
+        if (old_user := cls._users.get(data.get("id"))):
+            old_user.access_token = None
+
         user = User(cls, data)
         cls._users[user.id] = user
+        cls._users.move_to_end(user.id)
+        cls.account(user)
+        if old_user:
+            cls.account(old_user)
+        cls.evict()
+        UserStore.save(user)
         return user
     
     @classmethod
     def get(cls, *, user_id: str = None, token: str = None) -> Optional[User]:
-        if user_id:
-            return cls._users.get(user_id)
+        if not user_id and token:
+            user_id = cls._tokens.get(cls._hash_token(token))
+
+        if not user_id and not token:
+            return None
+        
+        user = cls._users.get(user_id)
+        if user and user.is_evictable and time.monotonic() - user._last_active > cls._idle_ttl:
+            cls.remove(user)
+            cls._stats["evictions"] += 1
+            user = None
+
+        if not user:
+            cls._stats["misses"] += 1
+            return None
+        
+        cls._stats["hits"] += 1
+        cls.touch(user)
+        return user
+    
+    @classmethod
+    def resolve(cls, user_id: str) -> Optional[Union[User, "RemoteUser"]]:
+        """Return the user to deliver bot messages to, which may be connected to another process."""
+        user = cls.get(user_id=user_id)
+        if user and user.is_connected:
+            return user
+        return Cluster.remote_user(user_id) or user
+    
+    @classmethod
+    def touch(cls, user: User) -> None:
+        user._last_active = time.monotonic()
+        if user.id in cls._users:
+            cls._users.move_to_end(user.id)
+    
+    @classmethod
+    def account(cls, user: User) -> None:
+        """Update the running approx_bytes total after a user was added, removed or changed."""
+        size = user.approx_size if cls._users.get(user.id) is user else 0
+        cls._bytes += size - user._counted_bytes
+        user._counted_bytes = size
+
+    @classmethod
+    def remove(cls, user: User) -> None:
+        if cls._users.get(user.id) is user:
+            del cls._users[user.id]
+            cls.account(user)
+        
+        if user.bot and user.bot._users.get(user.id) is user:
+            del user.bot._users[user.id]
+            user.bot = None
         
-        if token:
-            for user in cls._users.values():
-                if user.access_token == token:
-                    return user
+        user.access_token = None
+    
+    @classmethod
+    def evict(cls) -> None:
+        """
+        Drop disconnected users that have been idle longer than the TTL, then
+        the least recently used ones until the pool fits in max_entries.
+        Users with a live websocket or a guild are never evicted.
+        """
+        now = time.monotonic()
+        overflow = len(cls._users) - cls._max_entries
+        evicted = []
+        # Walk from the least recently used end and stop at the first user to keep
+        for user in cls._users.values():
+            expired = now - user._last_active > cls._idle_ttl
+            if overflow <= 0 and not expired:
+                break
+
+            if user.is_evictable:
+                evicted.append(user)
+                overflow -= 1
+
+        for user in evicted:
+            cls.remove(user)
+            cls._stats["evictions"] += 1
+    
+    @classmethod
+    def stats(cls) -> Dict[str, int]:
+        return {
+            "size": len(cls._users),
+            **cls._stats,
+            "approx_bytes": cls._bytes
+        }
+    
+    @classmethod
+    async def disconnect_all(cls, code: int = 1004, drain: bool = False) -> None:
+        await asyncio.gather(*[user.disconnect(code, drain) for user in list(cls._users.values()) if user.is_connected], return_exceptions=True)
+    
+    @classmethod
+    def logout(cls, token: str) -> None:
+        user = cls.get(token=token)
+        if user:
+            UserStore.delete(user.id)
+            cls.forget(user)
+
+    @classmethod
+    def forget(cls, user: User) -> None:
+        user.access_token = None
+        if user.is_evictable:
+            cls.remove(user)
+
+class RemoteUser:
+    """A user whose websocket is held by another dashboard process."""
+    def __init__(self, user_id: str, origin: str):
+        self.id: str = user_id
+        self.origin: str = origin
+        self.bot: Optional[Bot] = None
+        self.guild: Optional[Guild] = None
+
+        self.latency: float = 0
+        self.decoded_tracks: bool = False
+        self.encoding: str = "json"
+
+    async def send(self, payload: Dict) -> None:
+        await self.send_raw(encode_payload(payload), payload.get("op"))
+
+    async def send_raw(self, data: Union[str, bytes], op: Optional[str] = None, key: Optional[str] = None) -> None:
+        await Cluster.deliver(self.origin, [self.id], data)
+
+    async def send_to_bot(self, payload: Dict) -> None:
+        payload["userId"] = self.id
+
+        if self.guild:
+            return await self.guild.send_to_bot(payload)
+
+        elif self.bot:
+            return await self.bot.send_request(payload)
+
+    @property
+    def is_connected(self) -> bool:
+        return True
+
+    def __repr__(self) -> str:
+        return f"ID={self.id} Remote=True, Guild={self.guild}"
+
+class RemoteBot:
+    """A bot whose websocket is held by another dashboard process."""
+    def __init__(self, bot_id: str, origin: str):
+        self.id: str = bot_id
+        self.origin: str = origin
+        self.latency: float = 0
+        self._users: Dict[str, User] = {}
+
+    async def _publish(self, kind: str, payload: Dict) -> None:
+        await Cluster.publish(f"bot:{self.id}", json_dumps({"kind": kind, "payload": payload}))
+
+    async def send(self, payload: Dict) -> None:
+        await self._publish("send", payload)
+
+    async def send_request(self, payload: Dict) -> None:
+        await self._publish("request", payload)
+
+    async def release(self, user: User) -> None:
+        self._users.pop(user.id, None)
+        await self._publish("release", {"userId": user.id})
+
+    @property
+    def is_connected(self) -> bool:
+        return True
+
+class Cluster:
+    """
+    Routes traffic between users and bots that are connected to different
+    dashboard processes. Each process announces its bots and users on the
+    presence channel, listens on bot:<id> for the bots it holds and on
+    worker:<origin> for frames addressed to its users. With the default
+    in-memory broker every hook is a no-op.
+    """
+    _broker: Broker = MemoryBroker()
+    _origin: str = uuid.uuid4().hex
+    _remote_bots: Dict[str, RemoteBot] = {}
+    _remote_users: Dict[str, RemoteUser] = {}
+
+    @classmethod
+    async def start(cls, broker: Broker) -> None:
+        cls._broker = broker
+        if not broker.distributed:
+            return
+
+        await broker.subscribe("presence", cls._on_presence)
+        await broker.subscribe("bots", cls._on_bots)
+        await broker.subscribe(f"worker:{cls._origin}", cls._on_worker_message)
+        broker.on_reconnect = cls._on_reconnect
+        await broker.connect()
+        await cls._announce("sync", None, True)
+
+    @classmethod
+    async def stop(cls) -> None:
+        if cls.is_distributed():
+            for bot in BotPool._bots.values():
+                if bot.is_connected:
+                    await cls._announce("bot", bot.id, False)
+            for user in UserPool._users.values():
+                if user.is_connected:
+                    await cls._announce("user", user.id, False)
+
+        await cls._broker.close()
+        cls._broker = MemoryBroker()
+        cls._remote_bots, cls._remote_users = {}, {}
+
+    @classmethod
+    def is_distributed(cls) -> bool:
+        return cls._broker.distributed
+
+    @classmethod
+    async def publish(cls, channel: str, message: Union[str, bytes]) -> None:
+        try:
+            await cls._broker.publish(channel, message)
+        except Exception as e:
+            LOGGER.error(f"Unable to publish to the message broker channel {channel}.", exc_info=e)
+
+    @classmethod
+    async def deliver(cls, origin: str, user_ids: List[str], data: Union[str, bytes]) -> None:
+        """Send one JSON frame to users held by the process `origin`."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        await cls.publish(f"worker:{origin}", ",".join(user_ids).encode("utf-8") + b"\n" + data)
+
+    @classmethod
+    async def _announce(cls, kind: str, target_id: Optional[str], online: bool) -> None:
+        await cls.publish("presence", json_dumps({"origin": cls._origin, "kind": kind, "id": target_id, "online": online}))
+
+    @classmethod
+    async def _announce_all(cls) -> None:
+        for bot in BotPool._bots.values():
+            if bot.is_connected:
+                await cls._announce("bot", bot.id, True)
+        for user in UserPool._users.values():
+            if user.is_connected:
+                await cls._announce("user", user.id, True)
+
+    @classmethod
+    async def _on_reconnect(cls) -> None:
+        # Presence may have changed while the broker was unreachable
+        await cls._announce("sync", None, True)
+        await cls._announce_all()
+
+    @classmethod
+    def remote_bot(cls, bot_id: str) -> Optional[RemoteBot]:
+        return cls._remote_bots.get(bot_id)
+
+    @classmethod
+    def remote_user(cls, user_id: str) -> Optional[RemoteUser]:
+        return cls._remote_users.get(user_id)
+
+    @classmethod
+    async def attach_bot(cls, bot: Bot) -> None:
+        if cls.is_distributed():
+            await cls._broker.subscribe(f"bot:{bot.id}", lambda message: cls._on_bot_message(bot.id, message))
+            await cls._announce("bot", bot.id, True)
+
+    @classmethod
+    async def detach_bot(cls, bot: Bot) -> None:
+        if cls.is_distributed():
+            await cls._broker.unsubscribe(f"bot:{bot.id}")
+            await cls._announce("bot", bot.id, False)
+
+    @classmethod
+    async def attach_user(cls, user: User) -> None:
+        if cls.is_distributed():
+            await cls._announce("user", user.id, True)
+
+    @classmethod
+    async def detach_user(cls, user: User) -> None:
+        if cls.is_distributed():
+            await cls._announce("user", user.id, False)
+
+    @classmethod
+    async def logout(cls, user_id: str) -> None:
+        """Make every other process drop the user's token as well."""
+        if cls.is_distributed():
+            await cls._announce("logout", user_id, False)
+
+    @classmethod
+    async def broadcast_bots(cls, payload: Dict) -> None:
+        if cls.is_distributed():
+            await cls.publish("bots", json_dumps({"origin": cls._origin, "payload": payload}))
+
+    @classmethod
+    async def _on_presence(cls, message: bytes) -> None:
+        data = json_loads(message)
+        if data.get("origin") == cls._origin:
+            return
+
+        kind, target_id, online, origin = data.get("kind"), data.get("id"), data.get("online"), data.get("origin")
+        if kind == "sync":
+            # A process just joined, tell it what this one is holding
+            await cls._announce_all()
+
+        elif kind == "bot":
+            if online:
+                cls._remote_bots.setdefault(target_id, RemoteBot(target_id, origin)).origin = origin
+            # A late offline from a process the bot already moved away from is stale
+            elif (bot := cls._remote_bots.get(target_id)) and bot.origin == origin:
+                del cls._remote_bots[target_id]
+                for user in list(bot._users.values()):
+                    if user.bot is bot:
+                        user.bot = None
+                        await user.send({"op": "closeConnection"})
+
+        elif kind == "logout":
+            if (user := UserPool._users.get(target_id)):
+                UserPool.forget(user)
+
+        elif kind == "user":
+            if online:
+                cls._remote_users.setdefault(target_id, RemoteUser(target_id, origin)).origin = origin
+            elif (user := cls._remote_users.get(target_id)) and user.origin == origin:
+                del cls._remote_users[target_id]
+                if user.guild:
+                    await user.guild.remove_user(user)
+                if user.bot and user.bot._users.get(user.id) is user:
+                    del user.bot._users[user.id]
+
+    @classmethod
+    async def _on_bots(cls, message: bytes) -> None:
+        data = json_loads(message)
+        if data.get("origin") != cls._origin:
+            await fan_out(list(BotPool._bots.values()), data.get("payload", {}))
+
+    @classmethod
+    async def _on_bot_message(cls, bot_id: str, message: bytes) -> None:
+        bot = BotPool._bots.get(bot_id)
+        if not bot or not bot.is_connected:
+            return
+
+        data = json_loads(message)
+        kind, payload = data.get("kind"), data.get("payload", {})
+        if kind == "send":
+            return await bot.send(payload)
+
+        user = UserPool.resolve(payload.get("userId"))
+        if not isinstance(user, RemoteUser):
+            return
+
+        if kind == "release":
+            if user.guild:
+                await user.guild.remove_user(user)
+            bot._users.pop(user.id, None)
+            user.bot = None
+
+        elif kind == "request":
+            if user.bot is not bot:
+                user.bot = bot
+                bot._users[user.id] = user
+            await user.send_to_bot(payload)
+
+    @classmethod
+    async def _on_worker_message(cls, message: bytes) -> None:
+        user_ids, _, data = message.partition(b"\n")
+        users = [user for user_id in user_ids.decode().split(",") if (user := UserPool.get(user_id=user_id)) and user.is_connected]
+        if users:
+            await fan_out(users, json_loads(data))
 
 class Settings:
     def __init__(self, settings_file: str = "settings.json"):
@@ -344,8 +1628,19 @@ class Settings:
         self.client_secret_id: str = self.get_setting("client_secret_id") or os.getenv("CLIENT_SECRET_ID")
         self.secret_key: str = self.get_setting("secret_key") or os.getenv("SECRET_KEY")
         self.redirect_url: str = self.get_setting("redirect_url") or os.getenv("REDIRECT_URL")
+        self.workers: int = int(self.get_setting("workers") or os.getenv("WORKERS", 1))
+        self.loop: str = self.get_setting("loop") or os.getenv("LOOP", "auto")
+        self.version_check: bool = self.get_setting("version_check", os.getenv("VERSION_CHECK", "true").lower() != "false")
 
         self.logging: Dict[str, Any] = self.get_setting("logging")
+        self.user_cache: Dict[str, Any] = self.get_setting("user_cache", {})
+        self.websocket: Dict[str, Any] = self.get_setting("websocket", {})
+        self.result_cache: Dict[str, Any] = self.get_setting("result_cache", {})
+        self.pubsub: Dict[str, Any] = self.get_setting("pubsub", {})
+        if os.getenv("PUBSUB_URL"):
+            self.pubsub = {"backend": "redis", "url": os.getenv("PUBSUB_URL")}
+        if os.getenv("USER_STORE_PATH"):
+            self.user_cache = {**self.user_cache, "persist_path": os.getenv("USER_STORE_PATH")}
 
     def get_setting(self, key: str, default: Optional[str] = None) -> Optional[str]:
         return self.settings.get(key, default)
@@ -0,0 +1,322 @@
+import asyncio
+import logging
+
+from urllib.parse import urlparse
+from typing import (
+    Optional,
+    Callable,
+    Awaitable,
+    Union,
+    Dict,
+    List,
+    Set,
+    Any
+)
+
+LOGGER = logging.getLogger("dashboard")
+
+Handler = Callable[[bytes], Awaitable[None]]
+
+class ReplyError(Exception):
+    """An error reply from the broker, the connection itself is still usable."""
+
+class Broker:
+    """
+    Publish/subscribe transport used to route messages between dashboard
+    processes. Messages are opaque bytes delivered to every subscriber
+    of a channel, including the publishing process.
+    """
+    distributed: bool = False
+
+    async def connect(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def publish(self, channel: str, message: Union[str, bytes]) -> None:
+        raise NotImplementedError
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        raise NotImplementedError
+
+    async def unsubscribe(self, channel: str) -> None:
+        raise NotImplementedError
+
+class MemoryBroker(Broker):
+    """Single process broker, used when the dashboard runs as one worker."""
+    def __init__(self):
+        self._handlers: Dict[str, Handler] = {}
+
+    async def publish(self, channel: str, message: Union[str, bytes]) -> None:
+        if (handler := self._handlers.get(channel)):
+            await handler(message.encode("utf-8") if isinstance(message, str) else message)
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers[channel] = handler
+
+    async def unsubscribe(self, channel: str) -> None:
+        self._handlers.pop(channel, None)
+
+def _encode_command(*args: Union[str, bytes, int]) -> bytes:
+    parts = [f"*{len(args)}\r\n".encode()]
+    for arg in args:
+        if isinstance(arg, int):
+            arg = str(arg)
+        if isinstance(arg, str):
+            arg = arg.encode("utf-8")
+        parts.append(b"$%d\r\n%s\r\n" % (len(arg), arg))
+    return b"".join(parts)
+
+async def _read_reply(reader: asyncio.StreamReader) -> Any:
+    line = await reader.readline()
+    if not line:
+        raise ConnectionError("Connection closed by the broker")
+
+    kind, value = line[:1], line[1:-2]
+    if kind == b"+":
+        return value.decode()
+    if kind == b"-":
+        raise ReplyError(value.decode())
+    if kind == b":":
+        return int(value)
+    if kind == b"$":
+        length = int(value)
+        return None if length < 0 else (await reader.readexactly(length + 2))[:-2]
+    if kind == b"*":
+        length = int(value)
+        return None if length < 0 else [await _read_reply(reader) for _ in range(length)]
+    raise ConnectionError(f"Unexpected reply from the broker: {line!r}")
+
+class RedisBroker(Broker):
+    """
+    Broker speaking the Redis protocol (RESP) over plain asyncio streams, so
+    it works with a Redis server or with the built-in BrokerServer.
+
+    Publishes are pipelined on one connection and their replies are read by
+    a background task. If either connection drops, both are reopened with
+    a backoff, every channel is subscribed again and on_reconnect is called
+    so the owner can resync whatever it missed.
+    """
+    distributed: bool = True
+
+    RECONNECT_DELAYS = (0.5, 1, 2, 5, 10, 30)
+
+    def __init__(self, url: str = "redis://localhost:6379"):
+        parsed = urlparse(url)
+        self._host: str = parsed.hostname or "localhost"
+        self._port: int = parsed.port or 6379
+        self._password: Optional[str] = parsed.password
+
+        self.on_reconnect: Optional[Callable[[], Awaitable[None]]] = None
+
+        self._handlers: Dict[str, Handler] = {}
+        self._publisher: Optional[asyncio.StreamWriter] = None
+        self._subscriber: Optional[asyncio.StreamWriter] = None
+        self._tasks: List[asyncio.Task] = []
+        self._reconnecting: Optional[asyncio.Task] = None
+        self._closed: bool = False
+
+    async def _open(self):
+        reader, writer = await asyncio.open_connection(self._host, self._port)
+        if self._password:
+            writer.write(_encode_command("AUTH", self._password))
+            await _read_reply(reader)
+        return reader, writer
+
+    async def connect(self) -> None:
+        self._closed = False
+        publisher_reader, publisher = await self._open()
+        try:
+            subscriber_reader, subscriber = await self._open()
+        except Exception:
+            publisher.close()
+            raise
+
+        self._publisher, self._subscriber = publisher, subscriber
+        self._tasks = [
+            asyncio.create_task(self._read_replies(publisher_reader)),
+            asyncio.create_task(self._listen(subscriber_reader))
+        ]
+
+        for channel in self._handlers:
+            subscriber.write(_encode_command("SUBSCRIBE", channel))
+        await subscriber.drain()
+        LOGGER.info(f"Connected to the message broker at {self._host}:{self._port}.")
+
+    def _disconnect(self) -> None:
+        for task in self._tasks:
+            if task is not asyncio.current_task():
+                task.cancel()
+        for writer in (self._publisher, self._subscriber):
+            if writer:
+                writer.close()
+        self._publisher = self._subscriber = None
+        self._tasks = []
+
+    async def close(self) -> None:
+        self._closed = True
+        if self._reconnecting:
+            self._reconnecting.cancel()
+            self._reconnecting = None
+        self._disconnect()
+
+    def _connection_lost(self, error: Exception) -> None:
+        if self._closed or self._reconnecting:
+            return
+
+        LOGGER.warning(f"Lost the connection to the message broker: {error!r}, reconnecting...")
+        self._disconnect()
+        self._reconnecting = asyncio.create_task(self._reconnect())
+
+    async def _reconnect(self) -> None:
+        attempt = 0
+        while not self._closed:
+            await asyncio.sleep(self.RECONNECT_DELAYS[min(attempt, len(self.RECONNECT_DELAYS) - 1)])
+            try:
+                await self.connect()
+                break
+            except (OSError, ConnectionError, ReplyError, asyncio.IncompleteReadError) as e:
+                attempt += 1
+                LOGGER.debug(f"Unable to reconnect to the message broker: {e!r}")
+        
+        self._reconnecting = None
+        if self.on_reconnect and not self._closed:
+            try:
+                await self.on_reconnect()
+            except Exception as e:
+                LOGGER.error("Error while resyncing after reconnecting to the message broker", exc_info=e)
+
+    async def publish(self, channel: str, message: Union[str, bytes]) -> None:
+        if not self._publisher:
+            raise ConnectionError("Not connected to the message broker")
+        
+        # Writes are never interleaved, the replies are read in order by _read_replies
+        self._publisher.write(_encode_command("PUBLISH", channel, message))
+        await self._publisher.drain()
+
+    async def subscribe(self, channel: str, handler: Handler) -> None:
+        self._handlers[channel] = handler
+        if self._subscriber:
+            self._subscriber.write(_encode_command("SUBSCRIBE", channel))
+            await self._subscriber.drain()
+
+    async def unsubscribe(self, channel: str) -> None:
+        if self._handlers.pop(channel, None) and self._subscriber:
+            self._subscriber.write(_encode_command("UNSUBSCRIBE", channel))
+            await self._subscriber.drain()
+
+    async def _read_replies(self, reader: asyncio.StreamReader) -> None:
+        try:
+            while True:
+                try:
+                    await _read_reply(reader)
+                except ReplyError as e:
+                    LOGGER.error(f"The message broker rejected a publish: {e}")
+        except (OSError, ConnectionError, asyncio.IncompleteReadError) as e:
+            self._connection_lost(e)
+
+    async def _listen(self, reader: asyncio.StreamReader) -> None:
+        while True:
+            try:
+                reply = await _read_reply(reader)
+            except ReplyError as e:
+                LOGGER.error(f"The message broker rejected a subscription: {e}")
+                continue
+            except (OSError, ConnectionError, asyncio.IncompleteReadError) as e:
+                return self._connection_lost(e)
+
+            if not isinstance(reply, list) or len(reply) != 3 or reply[0] != b"message":
+                continue
+
+            if (handler := self._handlers.get(reply[1].decode())):
+                try:
+                    await handler(reply[2])
+                except Exception as e:
+                    LOGGER.error(f"Error while handling a broker message on {reply[1]!r}", exc_info=e)
+
+class BrokerServer:
+    """
+    Minimal pub/sub server implementing the subset of RESP that RedisBroker
+    uses (PING, AUTH, PUBLISH, SUBSCRIBE, UNSUBSCRIBE). Lets several workers
+    share messages without an external Redis, and serves as a local stand-in
+    for one when testing.
+    """
+    def __init__(self, host: str = "127.0.0.1", port: int = 6379, password: Optional[str] = None):
+        self.host: str = host
+        self.port: int = port
+        self._password: Optional[str] = password
+        self._channels: Dict[bytes, Set[asyncio.StreamWriter]] = {}
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self) -> None:
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def close(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        subscribed: List[bytes] = []
+        authenticated = not self._password
+        try:
+            while True:
+                command = await _read_reply(reader)
+                if not isinstance(command, list) or not command:
+                    continue
+
+                name, args = command[0].upper(), command[1:]
+                if name == b"AUTH":
+                    authenticated = args[-1].decode() == self._password
+                    writer.write(b"+OK\r\n" if authenticated else b"-WRONGPASS invalid password\r\n")
+
+                elif not authenticated:
+                    writer.write(b"-NOAUTH Authentication required.\r\n")
+
+                elif name == b"PING":
+                    writer.write(b"+PONG\r\n")
+
+                elif name == b"PUBLISH":
+                    channel, message = args
+                    subscribers = self._channels.get(channel, set())
+                    for subscriber in subscribers:
+                        subscriber.write(_encode_command("message", channel, message))
+                    writer.write(b":%d\r\n" % len(subscribers))
+
+                elif name in (b"SUBSCRIBE", b"UNSUBSCRIBE"):
+                    for channel in args:
+                        if name == b"SUBSCRIBE":
+                            self._channels.setdefault(channel, set()).add(writer)
+                            subscribed.append(channel)
+                        else:
+                            self._channels.get(channel, set()).discard(writer)
+                            if channel in subscribed:
+                                subscribed.remove(channel)
+                        writer.write(_encode_command(name.decode().lower(), channel, len(subscribed)))
+
+                else:
+                    writer.write(b"-ERR unknown command\r\n")
+
+                await writer.drain()
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscribed:
+                self._channels.get(channel, set()).discard(writer)
+            writer.close()
+
+def create_broker(settings: Dict[str, Any]) -> Broker:
+    backend = settings.get("backend", "memory")
+    if backend == "memory":
+        return MemoryBroker()
+    if backend == "redis":
+        return RedisBroker(settings.get("url", "redis://localhost:6379"))
+    raise ValueError(f"Unknown pubsub backend: {backend}")
@@ -0,0 +1,15 @@
+class MsgPackDecoder{constructor(buffer){this.view=new DataView(buffer);this.bytes=new Uint8Array(buffer);this.position=0;this.textDecoder=new TextDecoder("utf-8");}
+decode(){const byte=this.readUint8();if(byte<=0x7f)return byte;if(byte>=0xe0)return byte-0x100;if((byte&0xe0)===0xa0)return this.readString(byte&0x1f);if((byte&0xf0)===0x90)return this.readArray(byte&0x0f);if((byte&0xf0)===0x80)return this.readMap(byte&0x0f);switch(byte){case 0xc0:return null;case 0xc2:return false;case 0xc3:return true;case 0xc4:return this.readBinary(this.readUint8());case 0xc5:return this.readBinary(this.readUint16());case 0xc6:return this.readBinary(this.readUint32());case 0xca:return this.read((view,pos)=>view.getFloat32(pos),4);case 0xcb:return this.read((view,pos)=>view.getFloat64(pos),8);case 0xcc:return this.readUint8();case 0xcd:return this.readUint16();case 0xce:return this.readUint32();case 0xcf:return Number(this.read((view,pos)=>view.getBigUint64(pos),8));case 0xd0:return this.read((view,pos)=>view.getInt8(pos),1);case 0xd1:return this.read((view,pos)=>view.getInt16(pos),2);case 0xd2:return this.read((view,pos)=>view.getInt32(pos),4);case 0xd3:return Number(this.read((view,pos)=>view.getBigInt64(pos),8));case 0xd9:return this.readString(this.readUint8());case 0xda:return this.readString(this.readUint16());case 0xdb:return this.readString(this.readUint32());case 0xdc:return this.readArray(this.readUint16());case 0xdd:return this.readArray(this.readUint32());case 0xde:return this.readMap(this.readUint16());case 0xdf:return this.readMap(this.readUint32());}
+throw new Error(`Unsupported MessagePack type 0x${byte.toString(16)}`);}
+read(getter,size){if(this.position+size>this.bytes.byteLength){throw new Error("End of buffer");}
+const value=getter(this.view,this.position);this.position+=size;return value;}
+readUint8(){return this.read((view,pos)=>view.getUint8(pos),1);}
+readUint16(){return this.read((view,pos)=>view.getUint16(pos),2);}
+readUint32(){return this.read((view,pos)=>view.getUint32(pos),4);}
+readBinary(length){return this.read((view,pos)=>this.bytes.slice(pos,pos+length),length);}
+readString(length){return this.textDecoder.decode(this.readBinary(length));}
+readArray(length){const array=new Array(length);for(let i=0;i<length;i++){array[i]=this.decode();}
+return array;}
+readMap(length){const map={};for(let i=0;i<length;i++){const key=this.decode();map[key]=this.decode();}
+return map;}}
+function decodeMsgPack(buffer){return new MsgPackDecoder(buffer).decode();}
\ No newline at end of file
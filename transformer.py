@@ -0,0 +1,196 @@
+import base64
+import functools
+import struct
+
+from typing import (
+    Optional,
+    Callable,
+    Container,
+    List,
+    Dict,
+    Any
+)
+
+TRACK_CACHE_SIZE = 50000
+
+# Must match TRACK_INFO_CACHE_SIZE and TRACK_INFO_FIELDS in assets/js/transformer.js
+CLIENT_CACHE_SIZE = 20000
+TRACK_INFO_FIELDS = ("title", "author", "length", "identifier", "isStream", "uri", "artworkUrl", "isrc", "sourceName", "position")
+
+class DataReader:
+    def __init__(self, base64_str: str):
+        self._buffer: bytes = base64.b64decode(base64_str)
+        self._position: int = 0
+
+    @property
+    def remaining(self) -> int:
+        return len(self._buffer) - self._position
+
+    def _read(self, count: int) -> bytes:
+        if self._position + count > len(self._buffer):
+            raise ValueError("End of buffer")
+        data = self._buffer[self._position:self._position + count]
+        self._position += count
+        return data
+
+    def read_byte(self) -> int:
+        return self._read(1)[0]
+
+    def read_boolean(self) -> bool:
+        return self.read_byte() != 0
+
+    def read_unsigned_short(self) -> int:
+        return struct.unpack(">H", self._read(2))[0]
+
+    def read_int(self) -> int:
+        return struct.unpack(">i", self._read(4))[0]
+
+    def read_long(self) -> int:
+        return struct.unpack(">Q", self._read(8))[0]
+
+    def read_nullable_utf(self, utfm: bool = False) -> Optional[str]:
+        if not self.read_boolean():
+            return None
+        return self.read_utfm() if utfm else self.read_utf()
+
+    def read_utf(self) -> str:
+        return self._read(self.read_unsigned_short()).decode("utf-8")
+
+    def read_utfm(self) -> str:
+        data = self._read(self.read_unsigned_short())
+        try:
+            # Modified UTF-8 only differs from UTF-8 for NUL and supplementary characters
+            return data.decode("utf-8")
+        except UnicodeDecodeError:
+            return read_utfm(data)
+
+def read_utfm(utf_bytes: bytes) -> str:
+    chars = []
+    count, utf_len = 0, len(utf_bytes)
+
+    while count < utf_len:
+        char = utf_bytes[count]
+        shift = char >> 4
+
+        if shift <= 7:
+            chars.append(char)
+            count += 1
+        elif 12 <= shift <= 13:
+            if count + 2 > utf_len:
+                raise ValueError("malformed input: partial character at end")
+            char2 = utf_bytes[count + 1]
+            if (char2 & 0xC0) != 0x80:
+                raise ValueError(f"malformed input around byte {count + 1}")
+            chars.append(((char & 0x1F) << 6) | (char2 & 0x3F))
+            count += 2
+        elif shift == 14:
+            if count + 3 > utf_len:
+                raise ValueError("malformed input: partial character at end")
+            char2, char3 = utf_bytes[count + 1], utf_bytes[count + 2]
+            if (char2 & 0xC0) != 0x80 or (char3 & 0xC0) != 0x80:
+                raise ValueError(f"malformed input around byte {count + 1}")
+            chars.append(((char & 0x0F) << 12) | ((char2 & 0x3F) << 6) | (char3 & 0x3F))
+            count += 3
+        else:
+            raise ValueError(f"malformed input around byte {count}")
+
+    # Code units may contain surrogate pairs, let the UTF-16 codec join them
+    return "".join(map(chr, chars)).encode("utf-16", "surrogatepass").decode("utf-16")
+
+def decode_probe_info(reader: DataReader) -> Dict[str, Any]:
+    return {"probe_info": reader.read_utf()}
+
+def decode_lavasrc_fields(reader: DataReader) -> Dict[str, Any]:
+    if reader.remaining <= 8:
+        return {}
+
+    return {
+        "album_name": reader.read_nullable_utf(),
+        "album_url": reader.read_nullable_utf(),
+        "artist_url": reader.read_nullable_utf(),
+        "artist_artwork_url": reader.read_nullable_utf(),
+        "preview_url": reader.read_nullable_utf(),
+        "is_preview": reader.read_boolean()
+    }
+
+DEFAULT_DECODER_MAPPING: Dict[str, Callable[[DataReader], Dict[str, Any]]] = {
+    "http": decode_probe_info,
+    "local": decode_probe_info,
+    "deezer": decode_lavasrc_fields,
+    "spotify": decode_lavasrc_fields,
+    "applemusic": decode_lavasrc_fields
+}
+
+@functools.lru_cache(maxsize=TRACK_CACHE_SIZE)
+def decode(track_id: str) -> Dict[str, Any]:
+    """
+    Decode an encoded Lavalink track into the fields the dashboard's Track
+    object is built from. Mirrors decode() in assets/js/transformer.js.
+    """
+    reader = DataReader(track_id)
+
+    flags = (reader.read_int() & 0xC0000000) >> 30
+    version = reader.read_byte() if flags & 1 else 1
+
+    track = {
+        "title": reader.read_utfm(),
+        "author": reader.read_utfm(),
+        "length": reader.read_long(),
+        "identifier": reader.read_utf(),
+        "isStream": reader.read_boolean(),
+        "uri": reader.read_nullable_utf()
+    }
+
+    if version == 3:
+        track["artworkUrl"] = reader.read_nullable_utf()
+        track["isrc"] = reader.read_nullable_utf()
+
+    track["sourceName"] = source = reader.read_utf()
+    if source in DEFAULT_DECODER_MAPPING:
+        DEFAULT_DECODER_MAPPING[source](reader)
+
+    track["position"] = reader.read_long()
+    track["isSeekable"] = not track["isStream"]
+
+    return {key: value for key, value in track.items() if value is not None}
+
+def track_ids(payload: Dict) -> List[str]:
+    """
+    Return the distinct encoded tracks a payload carries, in order. The
+    trackInfo list lines up with this order, see trackIds() in
+    assets/js/transformer.js.
+    """
+    tracks = payload.get("tracks")
+    if not isinstance(tracks, list):
+        tracks = (payload.get("data") or {}).get("history", []) if payload.get("op") == "initUser" else []
+
+    ids = dict.fromkeys(track.get("trackId") if isinstance(track, dict) else track for track in tracks)
+    ids[payload.get("firstTrackId")] = None
+    return [track_id for track_id in ids if isinstance(track_id, str)]
+
+def pack_track(track_id: str) -> List[Any]:
+    """Decode a track into a list of TRACK_INFO_FIELDS values."""
+    track = decode(track_id)
+    return [track.get(field) for field in TRACK_INFO_FIELDS]
+
+def attach_track_info(payload: Dict, include: Optional[Container[str]] = None) -> Dict:
+    """
+    Return the payload with a trackInfo list holding each track_ids() entry
+    decoded by pack_track(), so clients don't have to decode the tracks
+    themselves. Only tracks in `include` (default: all) are decoded, the
+    rest and tracks that fail to decode are left as null for the client.
+    """
+    track_info = []
+    for track_id in track_ids(payload):
+        packed = None
+        if include is None or track_id in include:
+            try:
+                packed = pack_track(track_id)
+            except Exception:
+                pass
+        track_info.append(packed)
+
+    while track_info and track_info[-1] is None:
+        track_info.pop()
+
+    return {**payload, "trackInfo": track_info} if track_info else payload
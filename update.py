@@ -1,4 +1,4 @@
-import requests, zipfile, os, shutil, argparse
+import zipfile, os, shutil, argparse, json, time
 from io import BytesIO
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -6,7 +6,10 @@ __version__ = "v2.0.3"
 
 GITHUB_API_URL = "https://api.github.com/repos/ChocoMeow/Vocard-Dashboard/releases/latest"
 VOCARD_DASHBOARD_URL = "https://github.com/ChocoMeow/Vocard-Dashboard/archive/"
-IGNORE_FILES = ["settings.json", "logs"]
+VERSION_CACHE_PATH = os.path.join(ROOT_DIR, ".version_cache.json")
+VERSION_CACHE_TTL = 6 * 60 * 60
+REQUEST_TIMEOUT = 10
+IGNORE_FILES = ["settings.json", "logs", ".version_cache.json"]
 
 class bcolors:
     WARNING = '\033[93m'
@@ -14,17 +17,37 @@ class bcolors:
     OKGREEN = '\033[92m'
     ENDC = '\033[0m'
 
-def check_version(with_msg=False):
+def read_cached_version():
+    """Return the latest version seen within VERSION_CACHE_TTL, if any."""
+    try:
+        with open(VERSION_CACHE_PATH, "r") as file:
+            cache = json.load(file)
+        if time.time() - cache["checked_at"] < VERSION_CACHE_TTL:
+            return cache["latest_version"]
+    except (OSError, ValueError, KeyError):
+        return None
+
+def check_version(with_msg=False, use_cache=False):
     """Check for the latest version of the project.
 
     Args:
         with_msg (bool): option to print the message.
+        use_cache (bool): reuse the result of a recent check instead of asking Github.
 
     Returns:
         str: the latest version.
     """
-    response = requests.get(GITHUB_API_URL)
-    latest_version = response.json().get("name", __version__)
+    latest_version = read_cached_version() if use_cache else None
+    if not latest_version:
+        import requests  # Imported lazily, the dashboard only needs it for this background check
+        response = requests.get(GITHUB_API_URL, timeout=REQUEST_TIMEOUT)
+        latest_version = response.json().get("name", __version__)
+        try:
+            with open(VERSION_CACHE_PATH, "w") as file:
+                json.dump({"checked_at": time.time(), "latest_version": latest_version}, file)
+        except OSError:
+            pass
+
     if with_msg:
         msg = f"{bcolors.OKGREEN}Your dashboard is up-to-date! - {latest_version}{bcolors.ENDC}" if latest_version == __version__ else \
               f"{bcolors.WARNING}Your dashboard is not up-to-date! The latest version is {latest_version} and you are currently running version {__version__}\n. Run `python update.py -l` to update your dashboard!{bcolors.ENDC}"
@@ -40,9 +63,11 @@ def download_file(version=None):
     Returns:
         BytesIO: the downloaded zip file.
     """
+    import requests
+
     version = version if version else check_version()
     print(f"Downloading Vocard Dashboard version: {version}")
-    response = requests.get(VOCARD_DASHBOARD_URL + version + ".zip")
+    response = requests.get(VOCARD_DASHBOARD_URL + version + ".zip", timeout=REQUEST_TIMEOUT)
     if response.status_code == 404:
         print(f"{bcolors.FAIL}Warning: Version not found!{bcolors.ENDC}")
         exit()
@@ -1,10 +1,13 @@
-import aiohttp
 import asyncio
+import copy
+import hashlib
+import json
 import logging
-import sass
 import os
+import time
 import objects
 
+from collections import OrderedDict
 from logging.handlers import TimedRotatingFileHandler
 
 from geoip2 import (
@@ -13,34 +16,69 @@ from geoip2 import (
     errors
 )
 
+from babel.core import get_global
+from babel.languages import get_official_languages
 from quart import session
-from jsmin import jsmin
 
 from typing import (
+    TYPE_CHECKING,
     Optional,
+    Union,
     Dict,
     Any
 )
 
+if TYPE_CHECKING:
+    import aiohttp
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 DISCORD_API_BASE_URL = 'https://discord.com/api'
 VERSION_REQUIRED = "2.7.2"
 
 ROOT_DIR = os.path.dirname(os.path.abspath(__file__))
-ASSETS_DIR = os.path.join(ROOT_DIR, "assets")
 
 # Getting the GeoLite Database from https://github.com/P3TERX/GeoLite.mmdb
 GEODB_URL = "https://git.io/GeoLite2-Country.mmdb"
 GEODB_PATH = "geolite_db/GeoLite2-City.mmdb"
+GEOIP_CACHE_SIZE = 10000
+
+# HTTP client settings
+HTTP_POOL_LIMIT = 100
+HTTP_DNS_CACHE_TTL = 300
+HTTP_KEEPALIVE_TIMEOUT = 30
+HTTP_REQUEST_TIMEOUT = 10
+HTTP_MAX_RETRIES = 3
+HTTP_MAX_RETRY_AFTER = 60
 
-# SCSS paths
-SCSS_DIR = os.path.join(ASSETS_DIR, "scss")
-CSS_DIR = os.path.join(ROOT_DIR, "static", "css")
+# Websocket settings
+WS_SEND_TIMEOUT = 5
+SERVER_ONLY_KEYS = ("skip_users",)
 
-JS_SOURCE_DIR = os.path.join(ASSETS_DIR, "js")
-JS_OUTPUT_DIR = os.path.join(ROOT_DIR, "static", "js")
+# State frames where only the latest one matters to the client
+SUPERSEDABLE_OPS = ("updatePosition", "playerUpdate", "updateVolume", "updatePause")
 
 # Supported Languages
+DEFAULT_LANGUAGE = "en"
 LANGUAGES: Dict[str, Dict[str, str]] = {}
+COUNTRY_LANGUAGES: Dict[str, str] = {}
+
+_http_session: Optional["aiohttp.ClientSession"] = None
+_geoip_reader: Optional[database.Reader] = None
+_country_cache: OrderedDict[str, Optional[records.Country]] = OrderedDict()
 
 LOGGER = logging.getLogger("dashboard")
 
@@ -99,6 +137,48 @@ def setup_logging(log_settings: Dict[str, Any]):
     consoleHandler.setFormatter(ColoredFormatter())
     root_logger.addHandler(consoleHandler)
 
+def install_event_loop(name: Optional[str]) -> str:
+    """
+    Set the event loop policy for the `loop` setting ("auto", "uvloop" or
+    "asyncio") and return the implementation in use. Falls back to asyncio
+    when uvloop isn't installed or supported on this platform.
+    """
+    name = name or "auto"
+    if name in ("auto", "uvloop"):
+        if uvloop:
+            asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+            return "uvloop"
+        
+        if name == "uvloop":
+            LOGGER.warning("uvloop is not available, falling back to the asyncio event loop.")
+    
+    return "asyncio"
+
+def json_dumps(obj: Any) -> str:
+    if orjson:
+        return orjson.dumps(obj).decode("utf-8")
+    return json.dumps(obj, separators=(",", ":"))
+
+def json_loads(data: Union[str, bytes]) -> Any:
+    if orjson:
+        return orjson.loads(data)
+    return json.loads(data)
+
+def get_encoding(name: Optional[str]) -> str:
+    """Return the websocket encoding to use for a client that asked for `name`."""
+    if name == "msgpack" and msgpack:
+        return name
+    return "json"
+
+def encode_payload(payload: Dict, encoding: str = "json") -> Union[str, bytes]:
+    """Serialize a websocket payload, leaving out keys only the relay uses."""
+    if any(key in payload for key in SERVER_ONLY_KEYS):
+        payload = {key: value for key, value in payload.items() if key not in SERVER_ONLY_KEYS}
+    
+    if encoding == "msgpack":
+        return msgpack.packb(payload)
+    return json_dumps(payload)
+
 def get_locale() -> str:
     language = session.get("language_code")
     
@@ -108,60 +188,21 @@ def get_locale() -> str:
             user = objects.UserPool.get(token=token)
             language = user.language_code if user else None
 
-    return language or list(LANGUAGES.keys())[0]
+    return language or DEFAULT_LANGUAGE
 
-def process_js_files() -> None:
-    """
-    Compress and obfuscate JavaScript files from the source directory
-    and save them to the output directory.
-    """
-    os.makedirs(JS_OUTPUT_DIR, exist_ok=True)
-
-    for js_file in os.listdir(JS_SOURCE_DIR):
-        if js_file.endswith(".js"):
-            input_path = os.path.join(JS_SOURCE_DIR, js_file)
-            output_path = os.path.join(JS_OUTPUT_DIR, js_file.replace(".js", ".min.js"))
-            
-            try:
-                # Compress the JS file
-                with open(input_path, "r", encoding="utf-8") as source_file:
-                    compressed_js = jsmin(source_file.read(), quote_chars="'\"`")
-                
-                # Write compiled JS to the JS directory
-                with open(output_path, "w", encoding="utf-8") as js_file:
-                    js_file.write(compressed_js)
-                
-                LOGGER.debug(f"Successfully processed {js_file}.")
-            except Exception as e:
-                LOGGER.error(f"Error processing {js_file}: {e}")
-
-    LOGGER.info("Finished processing JavaScript files.")
-
-def compile_scss() -> None:
+def build_country_languages() -> None:
     """
-    Compile SCSS files from the SCSS directory into CSS, 
-    handling imports properly by compiling only entry-point SCSS files.
+    Map every known territory to its first official language, falling back
+    to the default language when it isn't one of the supported LANGUAGES.
+    Must be called after LANGUAGES has been populated.
     """
-    os.makedirs(CSS_DIR, exist_ok=True)
-
-    for scss_file in os.listdir(SCSS_DIR):
-        if scss_file.endswith(".scss") and not scss_file.startswith("_"):
-            scss_path = os.path.join(SCSS_DIR, scss_file)
-            css_path = os.path.join(CSS_DIR, scss_file.replace(".scss", ".css"))
-            
-            try:
-                # Compile SCSS file
-                compiled_css = sass.compile(filename=scss_path, include_paths=[SCSS_DIR], output_style="compressed")
-                
-                # Write compiled CSS to the CSS directory
-                with open(css_path, "w", encoding="utf-8") as css_file:
-                    css_file.write(compiled_css)
-
-                LOGGER.debug(f"Successfully compiled {scss_file}.")
-            except Exception as e:
-                LOGGER.error(f"Error compiling {scss_file}: {e}")
-
-    LOGGER.info("Finished compiling SCSS files.")
+    COUNTRY_LANGUAGES.clear()
+    for territory in get_global("territory_languages"):
+        languages = get_official_languages(territory)
+        COUNTRY_LANGUAGES[territory] = languages[0] if languages and languages[0] in LANGUAGES else DEFAULT_LANGUAGE
+
+def get_country_language(iso_code: Optional[str]) -> str:
+    return COUNTRY_LANGUAGES.get(iso_code or "US", DEFAULT_LANGUAGE)
 
 def check_version(current_version: str) -> bool:
     current_version = current_version.replace("v", "")
@@ -174,38 +215,208 @@ def check_version(current_version: str) -> bool:
 
     return current_version_tuple >= target_version_tuple
 
+def open_geoip_reader() -> None:
+    global _geoip_reader
+    if _geoip_reader is None and os.path.exists(GEODB_PATH):
+        _geoip_reader = database.Reader(GEODB_PATH, mode=database.MODE_MMAP)
+
+def close_geoip_reader() -> None:
+    global _geoip_reader
+    if _geoip_reader:
+        _geoip_reader.close()
+    _geoip_reader = None
+    _country_cache.clear()
+
 def _check_country_with_ip_sync(address: str) -> Optional[records.Country]:
-    with database.Reader(GEODB_PATH) as reader:
+    if address in _country_cache:
+        _country_cache.move_to_end(address)
+        return _country_cache[address]
+    
+    if not _geoip_reader:
+        return None
+
+    try:
+        country = _geoip_reader.country(address).country
+    except (errors.AddressNotFoundError, ValueError):
+        country = None
+    
+    _country_cache[address] = country
+    if len(_country_cache) > GEOIP_CACHE_SIZE:
+        _country_cache.popitem(last=False)
+    return country
+
+def get_http_session() -> "aiohttp.ClientSession":
+    """
+    Return the shared HTTP session, creating it on first use so that
+    connections to Discord are pooled and kept alive between requests.
+    """
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        # Imported here so startup doesn't pay for aiohttp until the first request needs it
+        import aiohttp
+
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL,
+            keepalive_timeout=HTTP_KEEPALIVE_TIMEOUT
+        )
+        _http_session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=aiohttp.ClientTimeout(total=HTTP_REQUEST_TIMEOUT)
+        )
+    return _http_session
+
+async def close_http_session() -> None:
+    global _http_session
+    if _http_session and not _http_session.closed:
+        await _http_session.close()
+    _http_session = None
+
+class RateLimitBucket:
+    def __init__(self):
+        self.remaining: Optional[int] = None
+        self.reset_at: float = 0
+        self.lock: asyncio.Lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self.lock:
+            now = time.monotonic()
+            if self.remaining == 0 and self.reset_at > now:
+                await asyncio.sleep(self.reset_at - now)
+                self.remaining = None
+
+            if self.remaining:
+                self.remaining -= 1
+
+    def update(self, remaining: Optional[str], reset_after: Optional[str]) -> None:
+        if remaining is not None:
+            self.remaining = int(remaining)
+        if reset_after is not None:
+            self.reset_at = time.monotonic() + float(reset_after)
+
+class RateLimiter:
+    """
+    Tracks Discord rate limits from the X-RateLimit-* headers. Requests
+    wait for their bucket (or the global limit) to reset instead of failing.
+    """
+    _routes: Dict[str, str] = {}
+    _buckets: Dict[str, RateLimitBucket] = {}
+    _global_reset: float = 0
+    _max_buckets: int = 10000
+
+    @staticmethod
+    def _scope(headers: Optional[dict]) -> str:
+        auth = (headers or {}).get("Authorization")
+        return hashlib.sha256(auth.encode("utf-8")).hexdigest() if auth else ""
+
+    @classmethod
+    def get_bucket(cls, route: str, scope: str) -> RateLimitBucket:
+        key = f"{cls._routes.get(route, route)}:{scope}"
+        bucket = cls._buckets.get(key)
+        if not bucket:
+            if len(cls._buckets) >= cls._max_buckets:
+                cls._prune()
+            bucket = cls._buckets[key] = RateLimitBucket()
+        return bucket
+
+    @classmethod
+    def _prune(cls) -> None:
+        now = time.monotonic()
+        for key, bucket in list(cls._buckets.items()):
+            if bucket.reset_at <= now and not bucket.lock.locked():
+                del cls._buckets[key]
+
+    @classmethod
+    async def wait_global(cls) -> None:
+        delay = cls._global_reset - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+    @classmethod
+    def update(cls, route: str, scope: str, headers: Any) -> None:
+        if (bucket_hash := headers.get("X-RateLimit-Bucket")) and cls._routes.get(route) != bucket_hash:
+            cls._routes[route] = bucket_hash
+
+        cls.get_bucket(route, scope).update(
+            headers.get("X-RateLimit-Remaining"),
+            headers.get("X-RateLimit-Reset-After")
+        )
+
+    @classmethod
+    async def handle_429(cls, route: str, scope: str, resp: "aiohttp.ClientResponse") -> float:
         try:
-            response = reader.country(address)
-            return response.country
-        except errors.AddressNotFoundError:
-            return None
+            body = await resp.json(encoding="utf-8")
+        except Exception:
+            body = {}
+
+        retry_after = float(resp.headers.get("Retry-After") or body.get("retry_after") or 1)
+        if resp.headers.get("X-RateLimit-Global") == "true" or body.get("global"):
+            cls._global_reset = time.monotonic() + retry_after
+        else:
+            bucket = cls.get_bucket(route, scope)
+            bucket.remaining = 0
+            bucket.reset_at = time.monotonic() + retry_after
+
+        return retry_after
+
+    @classmethod
+    async def request(cls, url: str, method: str, data: dict = None, headers: dict = None) -> Optional[Any]:
+        route, scope = f"{method} {url.split('?')[0]}", cls._scope(headers)
+
+        for _ in range(HTTP_MAX_RETRIES + 1):
+            await cls.wait_global()
+            await cls.get_bucket(route, scope).acquire()
+
+            async with get_http_session().request(method, url, data=data, headers=headers) as resp:
+                cls.update(route, scope, resp.headers)
+
+                if resp.status == 429:
+                    retry_after = await cls.handle_429(route, scope, resp)
+                    if retry_after > HTTP_MAX_RETRY_AFTER:
+                        LOGGER.error(f"Rate limited on {route} for {retry_after:.2f}s, giving up.")
+                        return None
+                    LOGGER.warning(f"Rate limited on {route}, retrying in {retry_after:.2f}s.")
+                    continue
+
+                if resp.status != 200:
+                    LOGGER.debug(f"Received non-200 response: {resp.status} for URL: {url}")
+                    return None
+
+                json_response = await resp.json(encoding="utf-8")
+                LOGGER.debug(f"Received response: {json_response}")
+                return json_response
+
+        LOGGER.error(f"Gave up on {route} after {HTTP_MAX_RETRIES} rate limited retries.")
+        return None
+
+_inflight_requests: Dict[tuple, asyncio.Future] = {}
 
 async def requests_api(url: str, method: str = 'GET', data: dict = None, headers: dict = None) -> dict:
     LOGGER.debug(f"Making {method} request to {url} with data: {data} and headers: {headers}")
-    async with aiohttp.ClientSession() as session:
-        try:
-            if method == 'GET':
-                resp = await session.get(url, headers=headers)
-            elif method == 'POST':
-                resp = await session.post(url, data=data, headers=headers)
-            else:
-                raise ValueError(f"Unsupported method: {method}")
-            
-            if resp.status != 200:
-                LOGGER.debug(f"Received non-200 response: {resp.status} for URL: {url}")
-                return None
-            
-            json_response = await resp.json(encoding="utf-8")
-            LOGGER.debug(f"Received response: {json_response}")
-            return json_response
-        except Exception as e:
-            LOGGER.error(f"Error during API request to {url}: {e}")
-            return None
+    try:
+        if method not in ('GET', 'POST'):
+            raise ValueError(f"Unsupported method: {method}")
+
+        if method != 'GET':
+            return await RateLimiter.request(url, method, data, headers)
+
+        # Identical GETs (same url and token) share one upstream call
+        key = (url, (headers or {}).get("Authorization"))
+        if (future := _inflight_requests.get(key)):
+            return copy.copy(await asyncio.shield(future))
+
+        future = asyncio.ensure_future(RateLimiter.request(url, method, data, headers))
+        _inflight_requests[key] = future
+        future.add_done_callback(lambda _: _inflight_requests.pop(key, None))
+        return copy.copy(await asyncio.shield(future))
+    
+    except Exception as e:
+        LOGGER.error(f"Error during API request to {url}: {e}")
+        return None
 
 async def check_country_with_ip(address: str) -> Optional[records.Country]:
-    return await asyncio.to_thread(_check_country_with_ip_sync, address)
+    # The reader is memory mapped, so a lookup is cheap enough to run inline
+    return _check_country_with_ip_sync(address)
 
 async def download_geoip_db() -> None:
     # Create directory if it doesn't exist
@@ -215,12 +426,13 @@ async def download_geoip_db() -> None:
     if os.path.exists(GEODB_PATH):
         return
     
-    async with aiohttp.ClientSession() as session:
-        LOGGER.info("Downloading GeoIP database...")
-        async with session.get(GEODB_URL) as response:
-            if response.status == 200:
-                with open(GEODB_PATH, 'wb') as f:
-                    f.write(await response.read())
-                LOGGER.info("GeoIP database downloaded successfully.")
-            else:
-                LOGGER.error(f"Failed to download database: {response.status}")
\ No newline at end of file
+    import aiohttp
+
+    LOGGER.info("Downloading GeoIP database...")
+    async with get_http_session().get(GEODB_URL, timeout=aiohttp.ClientTimeout(total=None)) as response:
+        if response.status == 200:
+            with open(GEODB_PATH, 'wb') as f:
+                f.write(await response.read())
+            LOGGER.info("GeoIP database downloaded successfully.")
+        else:
+            LOGGER.error(f"Failed to download database: {response.status}")
\ No newline at end of file